@@ -0,0 +1,188 @@
+"""
+Cache of agent replies, so resending the same transcript costs nothing.
+
+Keys combine the agent definition (name, instructions, model, model
+settings) with a normalized transcript: lower-cased, whitespace collapsed
+and the standalone filler sounds "um", "uh" and "erm" removed, so a
+re-record that came out the same maps to the same reply. Changing an agent's instructions or
+settings changes every key for that agent.
+
+A small in-memory LRU answers repeats within the process; a SQLite tier
+keeps replies across restarts. Both expire entries after ``ttl`` seconds.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union
+
+import metrics
+import whisp_logging
+from agent_runtime import AgentSpec
+
+CACHE_DB_PATH = Path("sessions") / "agent_cache.db"
+DEFAULT_TTL = 7 * 24 * 3600.0
+MEMORY_ENTRIES = 256
+DISK_ENTRIES = 5000
+
+# Only hesitation sounds that are never words or units ("mm", "er", "ah" are)
+_FILLERS = re.compile(r"(?<!\S)(?:u+m+|u+h+|e+r+m+)(?=[\s,.]|$)[,.]?")
+_SPACE = re.compile(r"\s+")
+
+CACHE_LOOKUPS = metrics.counter("whisp_agent_cache_total", "Agent reply cache lookups.", ("agent", "result"))
+
+log = whisp_logging.get_logger("agent_cache")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS replies (
+    key TEXT PRIMARY KEY,
+    agent TEXT NOT NULL,
+    reply TEXT NOT NULL,
+    created REAL NOT NULL,
+    used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_replies_used ON replies(used);
+"""
+
+
+def normalize(text: str) -> str:
+    """Case-, whitespace- and filler-insensitive form of a transcript."""
+    return _SPACE.sub(" ", _FILLERS.sub(" ", text.lower())).strip()
+
+
+def cache_key(spec: AgentSpec, text: str) -> str:
+    identity = {
+        "name": spec.name,
+        "instructions": spec.instructions,
+        "model": spec.model,
+        "settings": spec.model_settings.to_json_dict(),
+        "text": normalize(text),
+    }
+    payload = json.dumps(identity, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AgentCache:
+    """
+    Two-tier reply cache; safe to share between threads.
+
+    Only successful replies should be stored: an error string cached here
+    would be served until it expires.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Union[str, Path]] = CACHE_DB_PATH,
+        ttl: float = DEFAULT_TTL,
+        memory_entries: int = MEMORY_ENTRIES,
+        disk_entries: int = DISK_ENTRIES,
+    ) -> None:
+        self._ttl = ttl
+        self._memory_entries = memory_entries
+        self._disk_entries = disk_entries
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        if db_path is not None:
+            db_path = Path(db_path)
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            with self._conn:
+                self._conn.execute("DELETE FROM replies WHERE created < ?", (time.time() - ttl,))
+
+    def get(self, spec: AgentSpec, text: str) -> Optional[str]:
+        key = cache_key(spec, text)
+        now = time.time()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None and now - hit[0] < self._ttl:
+                self._memory.move_to_end(key)
+                CACHE_LOOKUPS.labels(spec.name, "memory").inc()
+                return hit[1]
+            if hit is not None:
+                del self._memory[key]
+            row = self._disk_get(key, now)
+            if row is None:
+                CACHE_LOOKUPS.labels(spec.name, "miss").inc()
+                return None
+            self._remember(key, row[0], row[1])
+        CACHE_LOOKUPS.labels(spec.name, "disk").inc()
+        return row[1]
+
+    def put(self, spec: AgentSpec, text: str, reply: str) -> None:
+        key = cache_key(spec, text)
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, reply)
+            if self._conn is None:
+                return
+            try:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO replies (key, agent, reply, created, used) VALUES (?, ?, ?, ?, ?)",
+                        (key, spec.name, reply, now, now),
+                    )
+                    self._conn.execute(
+                        "DELETE FROM replies WHERE key IN "
+                        "(SELECT key FROM replies ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                        (self._disk_entries,),
+                    )
+            except sqlite3.Error as exc:
+                log.error("Agent cache write failed: %s", exc, extra={"agent": spec.name})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM replies")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _remember(self, key: str, created: float, reply: str) -> None:
+        self._memory[key] = (created, reply)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str, now: float) -> Optional[tuple[float, str]]:
+        if self._conn is None:
+            return None
+        try:
+            row = self._conn.execute("SELECT created, reply FROM replies WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            with self._conn:
+                if now - row[0] >= self._ttl:
+                    self._conn.execute("DELETE FROM replies WHERE key = ?", (key,))
+                    return None
+                self._conn.execute("UPDATE replies SET used = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as exc:
+            log.error("Agent cache read failed: %s", exc)
+            return None
+        return row
+
+
+_cache: Optional[AgentCache] = None
+_cache_lock = threading.Lock()
+
+
+def default_cache() -> AgentCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AgentCache()
+    return _cache
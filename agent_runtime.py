@@ -0,0 +1,307 @@
+"""
+Long-lived runtime for openai-agents calls.
+
+One background thread owns an asyncio event loop for the life of the
+process. The ``AsyncOpenAI`` client is created on that loop and installed
+as the SDK default, so its HTTP connection pool is reused across calls, and
+each configured ``Agent`` is built once on first use. Synchronous callers
+(the CLI, HTTP handler threads) use ``run``; coroutines on any loop can
+``await arun``. ``stream`` yields text deltas as the model produces them,
+and ``fan_out`` sends one input to several agents concurrently.
+
+Agent traces stay local: the runtime installs ``agent_tracing``'s processor
+in place of the SDK's remote exporter.
+"""
+
+import asyncio
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Coroutine, Iterable, Iterator, Mapping, Optional
+
+from openai import AsyncOpenAI
+from openai.types.responses import ResponseTextDeltaEvent
+from openai.types.shared import Reasoning
+from agents import Agent, ModelSettings, Runner, set_default_openai_client
+
+import agent_tracing
+import metrics
+
+DEFAULT_MODEL = "gpt-5"
+DEFAULT_SETTINGS = ModelSettings(
+    reasoning=Reasoning(effort="minimal"),  # can be "minimal", "low", "medium", "high"
+    verbosity="low",                        # "low", "medium", "high"
+)
+
+AGENT_SECONDS = metrics.histogram("whisp_agent_seconds", "Agent run latency.", ("agent",))
+AGENT_FIRST_TOKEN_SECONDS = metrics.histogram(
+    "whisp_agent_first_token_seconds", "Time from request to first streamed token.", ("agent",)
+)
+_STREAM_DONE = object()
+
+
+@dataclass(frozen=True)
+class AgentSpec:
+    name: str
+    instructions: str
+    model: str = DEFAULT_MODEL
+    model_settings: ModelSettings = field(default_factory=lambda: DEFAULT_SETTINGS, compare=False)
+
+    def build(self) -> Agent:
+        return Agent(
+            name=self.name,
+            instructions=self.instructions,
+            model=self.model,
+            model_settings=self.model_settings,
+        )
+
+
+@dataclass
+class AgentResult:
+    """Outcome of one agent in a fan-out; ``status`` is ok, error, timeout or cancelled."""
+
+    agent: str
+    output: str = ""
+    status: str = "ok"
+    error: Optional[str] = None
+    seconds: float = 0.0
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+    def to_dict(self) -> dict:
+        return {
+            "agent": self.agent,
+            "output": self.output,
+            "status": self.status,
+            "error": self.error,
+            "seconds": round(self.seconds, 3),
+            "cached": self.cached,
+        }
+
+
+class AgentRuntime:
+    def __init__(
+        self,
+        client_factory: Callable[[], AsyncOpenAI] = AsyncOpenAI,
+        trace_sample_rate: float = agent_tracing.DEFAULT_SAMPLE_RATE,
+    ) -> None:
+        self._client_factory = client_factory
+        self._trace_sample_rate = trace_sample_rate
+        self._trace_processor: Optional[agent_tracing.LocalTraceProcessor] = None
+        self._specs: dict[str, AgentSpec] = {}
+        self._agents: dict[str, Agent] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[AsyncOpenAI] = None
+        self._lock = threading.Lock()
+
+    def register(self, spec: AgentSpec) -> AgentSpec:
+        """Add (or replace) an agent definition; it is built lazily on first call."""
+        with self._lock:
+            self._specs[spec.name] = spec
+            self._agents.pop(spec.name, None)
+        return spec
+
+    def agent(self, name: str) -> Agent:
+        with self._lock:
+            agent = self._agents.get(name)
+            if agent is None:
+                agent = self._agents[name] = self._specs[name].build()
+            return agent
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self._ensure_started()
+        return self._loop
+
+    def _ensure_started(self) -> None:
+        if self._loop is not None:
+            return
+        with self._lock:
+            if self._loop is not None:
+                return
+            # Before the first run, so no span is ever queued for upload
+            self._trace_processor = agent_tracing.install(self._trace_sample_rate)
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def serve() -> None:
+                asyncio.set_event_loop(loop)
+                # Created on the runtime loop so its connection pool belongs to it
+                self._client = self._client_factory()
+                set_default_openai_client(self._client)
+                ready.set()
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=serve, name="agent-runtime", daemon=True)
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> "Future[Any]":
+        """Schedule ``coro`` on the runtime loop from any thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def _run(self, name: str, text: str) -> str:
+        agent = self.agent(name)
+        with AGENT_SECONDS.labels(name).time():
+            result = await Runner.run(agent, text)
+        return result.final_output.strip() if result and result.final_output else ""
+
+    def run(self, name: str, text: str, timeout: Optional[float] = None) -> str:
+        """Blocking call; must not be used from the runtime loop itself."""
+        if self._thread is not None and threading.current_thread() is self._thread:
+            raise RuntimeError("AgentRuntime.run() called from the runtime loop; await arun() instead")
+        return self.submit(self._run(name, text)).result(timeout)
+
+    async def _stream(self, name: str, text: str) -> AsyncIterator[str]:
+        agent = self.agent(name)
+        started = time.perf_counter()
+        with AGENT_SECONDS.labels(name).time():
+            result = Runner.run_streamed(agent, text)
+            first = True
+            async for event in result.stream_events():
+                if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                    if first:
+                        AGENT_FIRST_TOKEN_SECONDS.labels(name).observe(time.perf_counter() - started)
+                        first = False
+                    yield event.data.delta
+
+    def stream(self, name: str, text: str, timeout: Optional[float] = None) -> Iterator[str]:
+        """
+        Yield text deltas as they arrive; ``timeout`` bounds the wait for each one.
+
+        Closing the iterator early (e.g. the HTTP client went away) cancels
+        the run on the runtime loop.
+        """
+        if self._thread is not None and threading.current_thread() is self._thread:
+            raise RuntimeError("AgentRuntime.stream() called from the runtime loop")
+        deltas: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+
+        async def pump() -> None:
+            try:
+                async for delta in self._stream(name, text):
+                    deltas.put(delta)
+            except BaseException as exc:
+                deltas.put(exc)
+                raise
+            finally:
+                deltas.put(_STREAM_DONE)
+
+        future = self.submit(pump())
+        try:
+            while True:
+                try:
+                    item = deltas.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"No output from {name} for {timeout}s") from None
+                if item is _STREAM_DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            future.cancel()
+
+    async def _timed(self, name: str, text: str, deadline: Optional[float]) -> AgentResult:
+        started = time.perf_counter()
+        try:
+            output = await asyncio.wait_for(self._run(name, text), deadline)
+        except asyncio.TimeoutError:
+            return AgentResult(name, status="timeout", error=f"No reply within {deadline}s",
+                               seconds=time.perf_counter() - started)
+        except Exception as exc:
+            return AgentResult(name, status="error", error=str(exc), seconds=time.perf_counter() - started)
+        return AgentResult(name, output, seconds=time.perf_counter() - started)
+
+    async def afan_out(
+        self,
+        names: Iterable[str],
+        text: str,
+        first: bool = False,
+        deadlines: Optional[Mapping[str, float]] = None,
+        timeout: Optional[float] = None,
+    ) -> list[AgentResult]:
+        """
+        Run ``text`` through each agent concurrently; results keep the order of ``names``.
+
+        ``deadlines`` bounds individual agents, falling back to ``timeout``.
+        With ``first`` the call returns as soon as one agent succeeds and the
+        others are cancelled (reported with status "cancelled"); if none
+        succeeds, every result is returned as usual.
+        """
+        if asyncio.get_running_loop() is not self._loop:
+            return await asyncio.wrap_future(self.submit(self.afan_out(names, text, first, deadlines, timeout)))
+        names = list(names)
+        deadlines = deadlines or {}
+        started = time.perf_counter()
+        tasks = [asyncio.ensure_future(self._timed(name, text, deadlines.get(name, timeout))) for name in names]
+        if first:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if any(task.result().ok for task in done):
+                    break
+            for task in pending:
+                task.cancel()
+        else:
+            await asyncio.wait(tasks)
+        results = []
+        for name, task in zip(names, tasks):
+            try:
+                results.append(await task)
+            except asyncio.CancelledError:
+                results.append(AgentResult(name, status="cancelled", seconds=time.perf_counter() - started))
+        return results
+
+    def fan_out(
+        self,
+        names: Iterable[str],
+        text: str,
+        first: bool = False,
+        deadlines: Optional[Mapping[str, float]] = None,
+        timeout: Optional[float] = None,
+    ) -> list[AgentResult]:
+        """Blocking ``afan_out`` for threads outside the runtime loop."""
+        if self._thread is not None and threading.current_thread() is self._thread:
+            raise RuntimeError("AgentRuntime.fan_out() called from the runtime loop; await afan_out() instead")
+        return self.submit(self.afan_out(names, text, first, deadlines, timeout)).result()
+
+    async def arun(self, name: str, text: str) -> str:
+        """Awaitable from any event loop; the work itself runs on the runtime loop."""
+        if asyncio.get_running_loop() is self._loop:
+            return await self._run(name, text)
+        return await asyncio.wrap_future(self.submit(self._run(name, text)))
+
+    def close(self) -> None:
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.close(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(timeout=5)
+        loop.close()
+        if self._trace_processor is not None:
+            self._trace_processor.shutdown()
+
+
+_runtime: Optional[AgentRuntime] = None
+_runtime_lock = threading.Lock()
+
+
+def runtime() -> AgentRuntime:
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = AgentRuntime()
+                atexit.register(_runtime.close)
+    return _runtime
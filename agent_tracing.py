@@ -0,0 +1,111 @@
+"""
+Local trace processor for openai-agents runs.
+
+By default the SDK queues every span for upload to the OpenAI tracing
+backend from its own exporter thread. ``install`` replaces that with
+``LocalTraceProcessor``: span durations feed our metrics, and a sample of
+traces is written as Chrome trace events through ``tracing.writer()`` to
+the same rotating file as the snippet traces. Nothing leaves the machine.
+"""
+
+import os
+import random
+import threading
+import zlib
+from datetime import datetime
+from typing import Any, Optional
+
+from agents import Span, Trace, TracingProcessor, set_trace_processors
+
+import metrics
+import tracing
+
+DEFAULT_SAMPLE_RATE = 1.0
+BATCH_SPANS = 64
+_ARG_KEYS = ("name", "model", "response_id", "usage")
+
+AGENT_SPAN_SECONDS = metrics.histogram("whisp_agent_span_seconds", "openai-agents span durations.", ("kind",))
+AGENT_SPAN_ERRORS = metrics.counter("whisp_agent_span_errors_total", "openai-agents spans that ended in error.", ("kind",))
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+
+class LocalTraceProcessor(TracingProcessor):
+    """
+    Record agent spans as metrics and, for sampled traces, trace-file events.
+
+    Every span is measured; ``sample_rate`` only decides which traces are
+    written out. Events are batched per trace and handed to the trace
+    writer when the trace ends or ``BATCH_SPANS`` accumulate, so callbacks
+    on the agent loop never touch the disk.
+    """
+
+    def __init__(self, sample_rate: float = DEFAULT_SAMPLE_RATE) -> None:
+        self._sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._sampled: set[str] = set()
+        self._batch: list[dict] = []
+
+    def on_trace_start(self, trace: Trace) -> None:
+        if random.random() < self._sample_rate:
+            with self._lock:
+                self._sampled.add(trace.trace_id)
+
+    def on_trace_end(self, trace: Trace) -> None:
+        with self._lock:
+            self._sampled.discard(trace.trace_id)
+        self.force_flush()
+
+    def on_span_start(self, span: Span[Any]) -> None:
+        return
+
+    def on_span_end(self, span: Span[Any]) -> None:
+        kind = span.span_data.type
+        start, end = _timestamp(span.started_at), _timestamp(span.ended_at)
+        if start is not None and end is not None:
+            AGENT_SPAN_SECONDS.labels(kind).observe(end - start)
+        if span.error:
+            AGENT_SPAN_ERRORS.labels(kind).inc()
+        if start is None or end is None or span.trace_id not in self._sampled:
+            return
+        data = span.span_data.export()
+        event = {
+            "name": data.get("name") or kind,
+            "cat": "agents",
+            "ph": "X",
+            "ts": int(start * 1_000_000),
+            "dur": int((end - start) * 1_000_000),
+            "pid": os.getpid(),
+            # One row per agent trace in the viewer
+            "tid": zlib.crc32(span.trace_id.encode()),
+            "args": {
+                "trace_id": span.trace_id,
+                "span_id": span.span_id,
+                "parent_id": span.parent_id,
+                "kind": kind,
+                **{key: data[key] for key in _ARG_KEYS if data.get(key) is not None},
+                **({"error": span.error.get("message")} if span.error else {}),
+            },
+        }
+        with self._lock:
+            self._batch.append(event)
+            full = len(self._batch) >= BATCH_SPANS
+        if full:
+            self.force_flush()
+
+    def force_flush(self) -> None:
+        with self._lock:
+            batch, self._batch = self._batch, []
+        tracing.writer().submit(batch)
+
+    def shutdown(self) -> None:
+        self.force_flush()
+
+
+def install(sample_rate: float = DEFAULT_SAMPLE_RATE) -> LocalTraceProcessor:
+    """Make a LocalTraceProcessor the only trace processor, dropping the remote exporter."""
+    processor = LocalTraceProcessor(sample_rate)
+    set_trace_processors([processor])
+    return processor
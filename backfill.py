@@ -0,0 +1,296 @@
+"""
+Transcribe old recordings under ``sessions/`` that never got a real transcript.
+
+Files already in ``sessions/transcripts.log`` or stored un-mocked in the
+transcript database are skipped. The rest are transcribed by a bounded
+thread pool behind a global requests-per-minute limit, and every finished
+file is recorded in a JSONL manifest, so an interrupted run picks up where
+it stopped.
+
+    python backfill.py --workers 4 --rpm 50 --session backfill-2025-10
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+import metrics
+from transcript_store import SQLiteTranscriptStore
+
+SESSIONS_DIR = Path("sessions")
+JOURNAL_PATH = SESSIONS_DIR / "transcripts.log"
+MANIFEST_PATH = SESSIONS_DIR / "backfill-manifest.jsonl"
+AUDIO_SUFFIXES = (".wav", ".flac", ".ogg")
+
+BACKFILLED = metrics.counter("whisp_backfill_files_total", "Recordings processed by backfill.", ("result",))
+
+
+class TokenBucket:
+    """Thread-safe rate limiter: ``rate`` tokens per second, bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_seconds = (1 - self._tokens) / self._rate
+            time.sleep(wait_seconds)
+
+
+def _key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def journal_paths(journal: Path = JOURNAL_PATH) -> set[str]:
+    """Audio paths named in the ``[timestamp] path :: text`` journal."""
+    done = set()
+    try:
+        with open(journal, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if not line.startswith("["):
+                    continue
+                _, _, rest = line.partition("] ")
+                path, sep, _ = rest.partition(" :: ")
+                if sep:
+                    done.add(_key(path))
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def discover(root: Path = SESSIONS_DIR) -> Iterator[str]:
+    """Audio files under ``root`` in a stable order, walked without building a full listing."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(AUDIO_SUFFIXES):
+                yield os.path.join(dirpath, name)
+
+
+class Manifest:
+    """Append-only JSONL checkpoint; one line per finished file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.done: set[str] = set()
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn final line from an interrupted run
+                    if record.get("status") == "done":
+                        self.done.add(_key(record["audio_path"]))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def record(self, audio_path: str, status: str, **fields) -> None:
+        self._file.write(json.dumps({"audio_path": audio_path, "status": status, **fields}) + "\n")
+        self._file.flush()
+        if status == "done":
+            self.done.add(_key(audio_path))
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class Progress:
+    def __init__(self, total: int, every: float = 2.0) -> None:
+        self.total = total
+        self.finished = 0
+        self.failed = 0
+        self.bytes = 0
+        self._started = time.monotonic()
+        self._every = every
+        self._last_report = 0.0
+
+    def update(self, ok: bool, size: int) -> None:
+        self.finished += 1
+        self.bytes += size
+        if not ok:
+            self.failed += 1
+        now = time.monotonic()
+        if now - self._last_report >= self._every or self.finished == self.total:
+            self._last_report = now
+            print(self.line(now), file=sys.stderr)
+
+    def line(self, now: Optional[float] = None) -> str:
+        elapsed = max(1e-9, (now or time.monotonic()) - self._started)
+        rate = self.finished / elapsed
+        remaining = self.total - self.finished
+        eta = remaining / rate if rate else float("inf")
+        return (
+            f"[{self.finished}/{self.total}] {rate * 60:.1f} files/min, "
+            f"{self.bytes / elapsed / 1e6:.2f} MB/s, {self.failed} failed, "
+            f"ETA {_format_seconds(eta)}"
+        )
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds == float("inf"):
+        return "--"
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{secs:02d}s" if hours else f"{minutes}m{secs:02d}s"
+
+
+def pending_files(root: Path, manifest: Manifest, store: Optional[SQLiteTranscriptStore]) -> list[str]:
+    skip = journal_paths(root / JOURNAL_PATH.name) | manifest.done
+    if store is not None:
+        skip |= {_key(path) for path in store.transcribed_audio_paths()}
+    return [path for path in discover(root) if _key(path) not in skip]
+
+
+def run_backfill(
+    transcribe: Callable[[str], tuple[str, str]],
+    save: Callable[[str, str, str, str], object],
+    session_file: str,
+    root: Path = SESSIONS_DIR,
+    manifest_path: Path = MANIFEST_PATH,
+    store: Optional[SQLiteTranscriptStore] = None,
+    workers: int = 4,
+    per_minute: float = 50.0,
+    limit: Optional[int] = None,
+) -> Progress:
+    """
+    Transcribe every pending file; returns the final progress counters.
+
+    Only ``workers * 2`` files are in flight at once so an interrupt loses
+    little work. Results are saved from this thread in completion order,
+    which keeps ``save`` (plain file appends) single-threaded.
+    """
+    manifest = Manifest(manifest_path)
+    files = pending_files(root, manifest, store)
+    if limit is not None:
+        files = files[:limit]
+    progress = Progress(len(files))
+    print(f"Backfill: {len(files)} file(s) to transcribe with {workers} worker(s) at {per_minute:g}/min", file=sys.stderr)
+    bucket = TokenBucket(per_minute / 60.0)
+
+    def job(audio_path: str) -> tuple[str, str, float]:
+        bucket.acquire()
+        started = time.perf_counter()
+        raw_text, enhanced_text = transcribe(audio_path)
+        return raw_text, enhanced_text, time.perf_counter() - started
+
+    in_flight: dict[Future, str] = {}
+    queued = iter(files)
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backfill") as pool:
+            try:
+                while True:
+                    while len(in_flight) < workers * 2:
+                        audio_path = next(queued, None)
+                        if audio_path is None:
+                            break
+                        in_flight[pool.submit(job, audio_path)] = audio_path
+                    if not in_flight:
+                        break
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        _finish(future, in_flight.pop(future), save, session_file, store, manifest, progress)
+            except KeyboardInterrupt:
+                # Drop queued work; only requests already on the wire are waited for
+                pool.shutdown(wait=False, cancel_futures=True)
+                print(f"\nInterrupted; rerun to resume. {progress.line()}", file=sys.stderr)
+                raise
+    finally:
+        manifest.close()
+    return progress
+
+
+def _finish(
+    future: Future,
+    audio_path: str,
+    save: Callable[[str, str, str, str], object],
+    session_file: str,
+    store: Optional[SQLiteTranscriptStore],
+    manifest: Manifest,
+    progress: Progress,
+) -> None:
+    size = os.path.getsize(audio_path) if os.path.exists(audio_path) else 0
+    try:
+        raw_text, enhanced_text, seconds = future.result()
+        save(session_file, raw_text, enhanced_text, audio_path)
+        if store is not None:
+            transcript = enhanced_text.strip() or raw_text.strip()
+            store.add(transcript, audio_path, False, session=os.path.basename(session_file))
+    except Exception as exc:
+        BACKFILLED.labels("failed").inc()
+        manifest.record(audio_path, "failed", error=str(exc))
+        progress.update(False, size)
+        return
+    BACKFILLED.labels("done").inc()
+    manifest.record(audio_path, "done", seconds=round(seconds, 3))
+    progress.update(True, size)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Transcribe recordings in sessions/ that have no real transcript.")
+    parser.add_argument("--root", default=str(SESSIONS_DIR), help="directory to scan for audio")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent transcription requests")
+    parser.add_argument("--rpm", type=float, default=50.0, help="global limit on transcription requests per minute")
+    parser.add_argument("--session", help="session name for the .txt/.md output (default: backfill-<timestamp>)")
+    parser.add_argument("--manifest", help=f"checkpoint file (default: <root>/{MANIFEST_PATH.name})")
+    parser.add_argument("--db", help="transcript database to consult and update (default: <root>/transcripts.db)")
+    parser.add_argument("--no-db", action="store_true", help="neither consult nor update the transcript database")
+    parser.add_argument("--limit", type=int, help="stop after this many files")
+    parser.add_argument("--dry-run", action="store_true", help="list pending files and exit")
+    args = parser.parse_args(argv)
+
+    root = Path(args.root)
+    manifest_path = Path(args.manifest) if args.manifest else root / MANIFEST_PATH.name
+    store = None if args.no_db else SQLiteTranscriptStore(args.db or root / "transcripts.db")
+    try:
+        if args.dry_run:
+            manifest = Manifest(manifest_path)
+            try:
+                for path in pending_files(root, manifest, store)[: args.limit]:
+                    print(path)
+            finally:
+                manifest.close()
+            return
+
+        import transcripter_latest  # needs OPENAI_API_KEY; imported late so --dry-run works without it
+
+        session = args.session or datetime.now().strftime("backfill-%Y-%m-%d-%Hh-%Mm")
+        progress = run_backfill(
+            transcripter_latest.transcribe_and_enhance,
+            transcripter_latest.save_transcripts,
+            str(root / session),
+            root=root,
+            manifest_path=manifest_path,
+            store=store,
+            workers=args.workers,
+            per_minute=args.rpm,
+            limit=args.limit,
+        )
+        print(f"Backfill finished. {progress.line()}", file=sys.stderr)
+    except KeyboardInterrupt:
+        sys.exit(130)
+    finally:
+        if store is not None:
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
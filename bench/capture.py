@@ -0,0 +1,192 @@
+"""
+Micro-benchmarks for the capture pipeline in ``recorder_latest``.
+
+Everything runs against a synthetic numpy source, so no audio hardware is
+needed. Each case reports a single headline number with its unit; pass a
+previous report to ``--compare`` to print relative changes.
+
+    python -m bench.capture --output capture-before.json
+    python -m bench.capture --compare capture-before.json
+"""
+
+import argparse
+import io
+import json
+import queue
+import threading
+import time
+import tracemalloc
+from typing import Callable, Optional
+
+import numpy as np
+import soundfile as sf
+
+import recorder_latest
+from bench import emit, environment
+
+SAMPLERATE = 44100
+CHANNELS = 1
+BLOCK_FRAMES = 1024  # PortAudio's typical block size at 44.1 kHz
+
+
+def synthetic_audio(seconds: float, samplerate: int = SAMPLERATE, channels: int = CHANNELS) -> np.ndarray:
+    """Float32 tone plus noise, shaped like sounddevice input (frames, channels)."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * samplerate), dtype=np.float32) / samplerate
+    tone = 0.3 * np.sin(2 * np.pi * 440 * t) + 0.05 * rng.standard_normal(t.shape[0]).astype(np.float32)
+    return np.repeat(tone[:, None], channels, axis=1).astype(np.float32)
+
+
+def synthetic_blocks(seconds: float, block_frames: int = BLOCK_FRAMES) -> list[np.ndarray]:
+    audio = synthetic_audio(seconds)
+    return [audio[i:i + block_frames] for i in range(0, len(audio) - block_frames + 1, block_frames)]
+
+
+def best_of(repeat: int, fn: Callable[[], None]) -> float:
+    """Minimum wall time over ``repeat`` runs; the least noisy estimate."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def bench_callback_queue(seconds: float, repeat: int) -> dict:
+    """Blocks/s through the real capture callback into a consumer thread."""
+    blocks = synthetic_blocks(seconds)
+
+    def run() -> None:
+        q: "queue.Queue[np.ndarray]" = queue.Queue()
+        callback = recorder_latest._make_callback(q)
+
+        def consume() -> None:
+            for _ in range(len(blocks)):
+                q.get()
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        for block in blocks:
+            callback(block, len(block), None, None)
+        consumer.join()
+
+    elapsed = best_of(repeat, run)
+    return {"value": round(len(blocks) / elapsed, 1), "unit": "blocks/s", "higher_is_better": True}
+
+
+def _bench_encode(fmt: str, subtype: str, seconds: float, repeat: int) -> dict:
+    audio = synthetic_audio(seconds)
+
+    def run() -> None:
+        buffer = io.BytesIO()
+        sf.write(buffer, audio, SAMPLERATE, format=fmt, subtype=subtype)
+
+    elapsed = best_of(repeat, run)
+    return {"value": round(seconds / elapsed, 1), "unit": "x realtime", "higher_is_better": True}
+
+
+def bench_wav_encode(seconds: float, repeat: int) -> dict:
+    return _bench_encode("WAV", "PCM_16", seconds, repeat)
+
+
+def bench_flac_encode(seconds: float, repeat: int) -> dict:
+    return _bench_encode("FLAC", "PCM_16", seconds, repeat)
+
+
+def bench_chunk_assembly(seconds: float, repeat: int) -> dict:
+    """
+    Allocations made assembling one chunk the way ``record_chunks_push_to_talk``
+    does: extend a list with queued blocks, then ``_frames_to_wav``.
+    """
+    blocks = synthetic_blocks(seconds)
+
+    def buffer_blocks() -> list:
+        buffer = []
+        for block in blocks:
+            buffer.extend(block)
+        return buffer
+
+    def assemble() -> bytes:
+        return recorder_latest._frames_to_wav(buffer_blocks(), SAMPLERATE, CHANNELS)
+
+    assemble()  # warm imports and caches outside the measurement
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        buffer = buffer_blocks()
+        # Count what is live while the chunk sits in the buffer
+        buffered = tracemalloc.take_snapshot()
+        recorder_latest._frames_to_wav(buffer, SAMPLERATE, CHANNELS)
+        _, peak = tracemalloc.get_traced_memory()
+        del buffer
+    finally:
+        tracemalloc.stop()
+    allocations = sum(max(0, stat.count_diff) for stat in buffered.compare_to(before, "lineno"))
+    elapsed = best_of(repeat, assemble)
+    return {
+        "value": allocations,
+        "unit": "allocations/chunk",
+        "higher_is_better": False,
+        "peak_bytes": peak,
+        "seconds_per_chunk": round(elapsed, 6),
+    }
+
+
+BENCHMARKS: dict[str, Callable[[float, int], dict]] = {
+    "callback_queue": bench_callback_queue,
+    "wav_encode": bench_wav_encode,
+    "flac_encode": bench_flac_encode,
+    "chunk_assembly": bench_chunk_assembly,
+}
+
+
+def run_all(seconds: float = 10.0, repeat: int = 5, only: Optional[list[str]] = None) -> dict:
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        results[name] = bench(seconds, repeat)
+    return {
+        "benchmark": "capture",
+        "environment": environment(),
+        "config": {"seconds": seconds, "repeat": repeat, "samplerate": SAMPLERATE, "block_frames": BLOCK_FRAMES},
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict) -> dict:
+    """Relative change per result; positive ``improvement`` is always better."""
+    changes = {}
+    for name, result in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous["value"]:
+            continue
+        delta = (result["value"] - previous["value"]) / previous["value"]
+        changes[name] = {
+            "before": previous["value"],
+            "after": result["value"],
+            "unit": result["unit"],
+            "improvement_pct": round(100 * (delta if result["higher_is_better"] else -delta), 1) + 0.0,
+        }
+    return changes
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10.0, help="seconds of synthetic audio per case")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case; the best is reported")
+    parser.add_argument("--only", nargs="*", choices=sorted(BENCHMARKS), help="run a subset of cases")
+    parser.add_argument("--compare", help="previous JSON report to diff against")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run_all(args.seconds, args.repeat, args.only)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            report["comparison"] = compare(report, json.load(f))
+    emit(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+HTTP load test for the recorder bridge.
+
+Runs ``whisp_web_server`` in-process on an ephemeral port with a synthetic
+audio source in place of the microphone and a fake transcription backend,
+then drives N virtual clients through start -> hold -> stop cycles.
+
+    python -m bench.http_load --clients 4 --cycles 25 --hold 0.2 --transcribe-latency 0.3
+
+The recorder is a single shared device, so overlapping clients see 409s on
+start; those are reported per endpoint alongside the latency percentiles.
+"""
+
+import argparse
+import http.client
+import math
+import random
+import struct
+import tempfile
+import threading
+import time
+import wave
+from datetime import datetime
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from unittest.mock import patch
+
+import keyboard  # type: ignore
+
+import recorder_latest
+import whisp_web_server
+from bench import emit, environment, summarize_ms
+from transcript_store import TranscriptStore
+
+
+class SyntheticRecorder:
+    """
+    Stand-in for ``recorder_latest.record_push_to_talk``.
+
+    Writes a 440 Hz tone in real-time-paced blocks while SPACE is held and
+    returns when BACKSPACE is tapped, honouring the same virtual keypad the
+    server patches into ``keyboard.is_pressed``.
+    """
+
+    def __init__(self, out_dir: Path, samplerate: int = 16000, block_frames: int = 1024) -> None:
+        self._out_dir = out_dir
+        self._samplerate = samplerate
+        self._block_frames = block_frames
+        self._counter = 0
+        self._lock = threading.Lock()
+        block = [int(8000 * math.sin(2 * math.pi * 440 * i / samplerate)) for i in range(block_frames)]
+        self._block = struct.pack(f"<{block_frames}h", *block)
+
+    def __call__(self) -> str:
+        with self._lock:
+            self._counter += 1
+            path = self._out_dir / f"{datetime.now():%Y-%m-%d-%Hh-%Mm}-bench-{self._counter}.wav"
+        block_seconds = self._block_frames / self._samplerate
+        with wave.open(str(path), "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self._samplerate)
+            while not keyboard.is_pressed("backspace"):
+                if keyboard.is_pressed("space"):
+                    wav.writeframes(self._block)
+                time.sleep(block_seconds)
+        return str(path)
+
+
+class FakeTranscriber:
+    """Replacement for ``whisp_web_server.run_transcription`` with tunable latency and failures."""
+
+    def __init__(self, latency: float, jitter: float = 0.0, error_rate: float = 0.0) -> None:
+        self._latency = latency
+        self._jitter = jitter
+        self._error_rate = error_rate
+
+    def __call__(self, audio_path: str) -> tuple[str, bool]:
+        time.sleep(max(0.0, self._latency + random.uniform(-self._jitter, self._jitter)))
+        if random.random() < self._error_rate:
+            return f"[Mock transcript: injected failure for {Path(audio_path).name}]", True
+        return f"synthetic transcript for {Path(audio_path).name}", False
+
+
+class _Client(threading.Thread):
+    def __init__(self, port: int, cycles: int, hold: float, poll_status: bool) -> None:
+        super().__init__(daemon=True)
+        self._port = port
+        self._cycles = cycles
+        self._hold = hold
+        self._poll_status = poll_status
+        self.samples: dict[str, list[float]] = {}
+        self.codes: dict[str, dict[str, int]] = {}
+        self.completed = 0
+
+    def run(self) -> None:
+        conn = http.client.HTTPConnection("127.0.0.1", self._port, timeout=60)
+        try:
+            for _ in range(self._cycles):
+                if self._request(conn, "POST", "/api/record/start") != 200:
+                    # Recorder held by another client; back off briefly and move on
+                    time.sleep(self._hold / 2)
+                    continue
+                time.sleep(self._hold)
+                if self._request(conn, "POST", "/api/record/stop") == 200:
+                    self.completed += 1
+                if self._poll_status:
+                    self._request(conn, "GET", "/api/status")
+        finally:
+            conn.close()
+
+    def _request(self, conn: http.client.HTTPConnection, method: str, path: str) -> int:
+        key = f"{method} {path}"
+        started = time.perf_counter()
+        conn.request(method, path, headers={"Accept-Encoding": "gzip"})
+        response = conn.getresponse()
+        response.read()
+        self.samples.setdefault(key, []).append(time.perf_counter() - started)
+        codes = self.codes.setdefault(key, {})
+        codes[str(response.status)] = codes.get(str(response.status), 0) + 1
+        return response.status
+
+
+def run_load(
+    clients: int = 4,
+    cycles: int = 25,
+    hold: float = 0.2,
+    transcribe_latency: float = 0.3,
+    transcribe_jitter: float = 0.0,
+    error_rate: float = 0.0,
+    poll_status: bool = True,
+    out_dir: Optional[Path] = None,
+) -> dict:
+    with tempfile.TemporaryDirectory(prefix="whisp-bench-") as tmp:
+        recorder = SyntheticRecorder(Path(out_dir or tmp))
+        transcriber = FakeTranscriber(transcribe_latency, transcribe_jitter, error_rate)
+        with patch.object(recorder_latest, "record_push_to_talk", recorder), patch.object(
+            whisp_web_server, "run_transcription", transcriber
+        ), patch.object(whisp_web_server, "transcript_store", TranscriptStore()), patch.object(
+            whisp_web_server, "recorder_service", whisp_web_server.RecorderService()
+        ):
+            server = ThreadingHTTPServer(("127.0.0.1", 0), whisp_web_server.RequestHandler)
+            server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+            server_thread.start()
+            try:
+                workers = [_Client(server.server_address[1], cycles, hold, poll_status) for _ in range(clients)]
+                started = time.perf_counter()
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+                elapsed = time.perf_counter() - started
+            finally:
+                server.shutdown()
+                server.server_close()
+
+    samples: dict[str, list[float]] = {}
+    codes: dict[str, dict[str, int]] = {}
+    for worker in workers:
+        for key, values in worker.samples.items():
+            samples.setdefault(key, []).extend(values)
+        for key, counts in worker.codes.items():
+            merged = codes.setdefault(key, {})
+            for code, count in counts.items():
+                merged[code] = merged.get(code, 0) + count
+    completed = sum(worker.completed for worker in workers)
+
+    return {
+        "benchmark": "http_load",
+        "environment": environment(),
+        "config": {
+            "clients": clients,
+            "cycles": cycles,
+            "hold_s": hold,
+            "transcribe_latency_s": transcribe_latency,
+            "transcribe_jitter_s": transcribe_jitter,
+            "error_rate": error_rate,
+            "poll_status": poll_status,
+        },
+        "duration_s": round(elapsed, 3),
+        "completed_cycles": completed,
+        "throughput_cycles_per_s": round(completed / elapsed, 3) if elapsed else 0.0,
+        "endpoints": {
+            key: {**summarize_ms(values), "codes": codes.get(key, {})} for key, values in sorted(samples.items())
+        },
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=4, help="virtual clients running concurrently")
+    parser.add_argument("--cycles", type=int, default=25, help="start/hold/stop cycles per client")
+    parser.add_argument("--hold", type=float, default=0.2, help="seconds to hold the key per cycle")
+    parser.add_argument("--transcribe-latency", type=float, default=0.3, help="fake transcription seconds")
+    parser.add_argument("--transcribe-jitter", type=float, default=0.0, help="+/- seconds of latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of fake transcriptions that fail")
+    parser.add_argument("--no-status", action="store_true", help="skip the /api/status poll after each stop")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run_load(
+        clients=args.clients,
+        cycles=args.cycles,
+        hold=args.hold,
+        transcribe_latency=args.transcribe_latency,
+        transcribe_jitter=args.transcribe_jitter,
+        error_rate=args.error_rate,
+        poll_status=not args.no_status,
+    )
+    emit(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,90 +2,152 @@
 # Orchestrates dictation flow using ui.py for all presentation
 
 import os
+import sys
+import argparse
 import datetime
-import pyperclip
-import recorder_latest
 import transcripter_latest
-import ui
-import my_agents as agents
+import stream_transcribe
+import session_index
+import session_log
+import whisp_logging
 
-LOG_FILE = "debug_log.txt"
+# Interactive-only modules (audio device, clipboard, agent SDK) are imported
+# inside the recording and menu paths, so --stdin runs without them.
 
-def log_debug(message: str, mode: str = "a"):
-    """Write debug messages to debug_log.txt in repo root."""
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    with open(LOG_FILE, mode, encoding="utf-8") as f:
-        f.write(f"[{timestamp}] {message}\n")
+LOG_FILE = whisp_logging.LOG_PATH
+log = whisp_logging.get_logger("flow")
 
-# marker on startup
-log_debug(">>> flow.py started", mode="w")
+def log_debug(message: str, **fields):
+    """Log a debug message to debug_log.txt (rotated, written off-thread)."""
+    log.info(message, extra=fields)
 
-def run_recording_loop(session_file: str, new_session=True):
-    """Main record-transcribe-append loop for a session."""
-    ui.snippet_recording_banner()
-    recording_path = recorder_latest.record_push_to_talk()
-    print("⌫ Finished.\n")
+# marker on startup; the log is rotated by size instead of truncated here
+log_debug(">>> flow.py started")
+
+def append_snippet(records, transcript_raw: str, transcript_enhanced: str, recording_path: str):
+    """Append one kept snippet to the session log; .txt/.md are rendered from it later."""
+    records.append_snippet(transcript_raw, transcript_enhanced, recording_path)
+    txt_entry = session_log.render_txt({"kind": "snippet", "raw": transcript_raw})
+    session_index.record_append(str(records.base) + ".txt", len(txt_entry.encode("utf-8")), recording_path)
+
+def show_completed(pipeline):
+    """Print snippets the background pipeline has finished since the last call."""
+    import ui
 
+    for snippet in pipeline.completed():
+        if snippet.error is not None:
+            print(f"✗ Error transcribing snippet {snippet.index}. See debug_log.txt for details.")
+        else:
+            ui.show_transcript(snippet.result[1])
+
+def run_recording_loop(session_file: str, new_session=True):
+    """
+    Record-transcribe-append loop for a session.
+
+    Each recording is handed to a background pipeline and the menu comes
+    back immediately, so the next snippet can be recorded while earlier ones
+    are still transcribing. Kept snippets are appended in recording order.
+    """
+    import pyperclip
+    import recorder_latest
+    import ui
+    import my_agents as agents
+    import session_memory
+    import session_pipeline
+
+    def on_error(snippet, e):
+        log_debug(f"Error during transcription of {snippet.audio_path}: {e}")
+
+    def append(raw, enhanced, path):
+        append_snippet(records, raw, enhanced, path)
+        memory.refresh()
+
+    records = session_log.SessionLog(session_file)
+    # Agents get a rolling summary plus the last few snippets, not the whole session
+    memory = session_memory.SessionMemory(records)
+    pipeline = session_pipeline.SessionPipeline(
+        transcripter_latest.transcribe_and_enhance,
+        append,
+        on_error=on_error,
+    )
     try:
-        transcript_raw, transcript_enhanced = transcripter_latest.transcribe_and_enhance(recording_path)
-        ui.show_transcript(transcript_enhanced)
-
-        txt_path = session_file + ".txt"
-        md_path = session_file + ".md"
-
-        with open(txt_path, "a", encoding="utf-8") as f:
-            f.write(transcript_raw.strip() + "\n---\n")
-
-        with open(md_path, "a", encoding="utf-8") as f:
-            f.write("## Raw Transcript\n")
-            f.write(transcript_raw.strip() + "\n\n")
-            f.write("## Enhanced Transcript\n")
-            f.write(transcript_enhanced.strip() + "\n")
-            f.write("---\n")
-
-    except Exception as e:
-        log_debug(f"Error during transcription: {e}")
-        print("✗ Error transcribing audio. See debug_log.txt for details.")
-        return
-
-    # Post-record menu
-    choice = ui.menu_post_record()
-    print(f"User Selection: [{choice}]\n")
-
-    if choice == "4":
-        pyperclip.copy(transcript_enhanced)
-        print("✓ Copied last snippet to clipboard. Exiting.")
-    elif choice == "5":
-        pyperclip.copy(transcript_enhanced)
-        print("✓ Copied last snippet to clipboard. You can record another.\n")
-        run_recording_loop(session_file, new_session=False)
-    elif choice == "1":
-        print("Re-recording...")
-        run_recording_loop(session_file, new_session=True)
-    elif choice == "2":
-        print("Session closed.")
-    elif choice == "3":
-        run_recording_loop(session_file, new_session=False)
-    elif choice == "6":
-        print("→ Sending to Agent Moneypenny...")
-        reply = agents.agent_moneypenny(transcript_raw)
-
-        # Log into .md file
-        md_path = session_file + ".md"
-        with open(md_path, "a", encoding="utf-8") as f:
-            f.write("## Agent Moneypenny\n")
-            f.write("### User Transcript\n")
-            f.write(transcript_raw.strip() + "\n\n")
-            f.write("### Agent Reply\n")
-            f.write(reply + "\n")
-            f.write("---\n")
-
-        print("✓ Response from Agent Moneypenny:")
-        ui.pretty_print_response(reply)
-    else:
-        print("Invalid choice, please try again.")
+        while True:
+            ui.snippet_recording_banner()
+            recording_path = recorder_latest.record_push_to_talk()
+            print("⌫ Finished.\n")
+            snippet = pipeline.submit(recording_path)
+
+            show_completed(pipeline)
+            if pipeline.pending() > 1:
+                print(f"({pipeline.pending() - 1} earlier snippet(s) still transcribing)\n")
+
+            # Post-record menu
+            choice = ui.menu_post_record()
+            print(f"User Selection: [{choice}]\n")
+
+            if choice == "1":
+                pipeline.discard(snippet)
+                print("Re-recording...")
+                continue
+
+            pipeline.keep(snippet)
+            if choice == "3":
+                continue
+            if choice == "2":
+                print("Session closed.")
+                break
+            if choice not in ("4", "5", "6", "7"):
+                print("Invalid choice, please try again.")
+                break
+
+            # The remaining options act on this snippet's text, so wait for it
+            pipeline.wait(snippet)
+            show_completed(pipeline)
+            if snippet.error is not None:
+                if choice == "5":
+                    continue
+                break
+            transcript_raw, transcript_enhanced = snippet.result
+
+            if choice == "4":
+                pyperclip.copy(transcript_enhanced)
+                print("✓ Copied last snippet to clipboard. Exiting.")
+                break
+            elif choice == "5":
+                pyperclip.copy(transcript_enhanced)
+                print("✓ Copied last snippet to clipboard. You can record another.\n")
+                continue
+            elif choice == "6":
+                print("→ Sending to Agent Moneypenny...")
+                print("✓ Response from Agent Moneypenny:")
+                reply = ui.stream_response(agents.agent_moneypenny_stream(memory.context(transcript_raw)))
+
+                # Recorded in the session log; rendered into the .md
+                records.append_agent_reply("Agent Moneypenny", transcript_raw, reply)
+                break
+            elif choice == "7":
+                print(f"→ Sending to {len(agents.AGENTS)} agents at once...")
+                for result in agents.fan_out(agents.AGENTS, memory.context(transcript_raw)):
+                    if result.ok:
+                        ui.print_success(f"{result.agent} ({result.seconds:.1f}s{', cached' if result.cached else ''}):")
+                        print(result.output + "\n")
+                        ui.divider()
+                        records.append_agent_reply(result.agent, transcript_raw, result.output)
+                    else:
+                        ui.print_error(f"{result.agent} {result.status}: {result.error}")
+                break
+    finally:
+        if pipeline.pending():
+            print("Waiting for remaining snippets to finish transcribing...")
+        pipeline.close()
+        show_completed(pipeline)
+        memory.close()
+        records.render_all()
+        records.close()
 
 def main():
+    import ui
+
     selection = ui.menu_start()
     print(f"User Selection: [{selection}]\n")
 
@@ -93,31 +155,20 @@ def main():
         name = input("Enter a session name (leave blank to use timestamp): ").strip()
         if not name:
             name = datetime.datetime.now().strftime("%Y-%m-%d-%Hh-%Mm-session")
-        os.makedirs("sessions", exist_ok=True)
-        session_base = os.path.join("sessions", name)
+        session_dir = session_index.shard_dir()
+        os.makedirs(session_dir, exist_ok=True)
+        session_base = os.path.join(session_dir, name)
         run_recording_loop(session_file=session_base, new_session=True)
 
     elif selection == "2":
-        sessions_dir = "sessions"
-        if not os.path.isdir(sessions_dir):
-            print("No existing sessions found.")
-            return
-
-        files = [f for f in os.listdir(sessions_dir) if f.lower().endswith(".txt")]
-        if not files:
+        recent = session_index.default_index().recent(5)
+        if not recent:
             print("No existing sessions found.")
             return
 
-        files = sorted(
-            files,
-            key=lambda f: os.path.getmtime(os.path.join(sessions_dir, f)),
-            reverse=True
-        )
-        recent = files[:5]
-
         print("\nRecent Sessions:")
-        for i, fname in enumerate(recent, 1):
-            print(f"[{i}] {fname}")
+        for i, info in enumerate(recent, 1):
+            print(f"[{i}] {info.name}.txt")
         ui.divider()
 
         sel = input("User Selection: ").strip()
@@ -130,24 +181,69 @@ def main():
             print("Invalid selection.")
             return
 
-        chosen_txt = os.path.join(sessions_dir, recent[idx])
+        chosen_txt = recent[idx].path
+        session_base = os.path.splitext(str(chosen_txt))[0]
+        if session_log.SessionLog.exists(session_base):
+            # Catch the .txt up with any snippets logged but not yet rendered
+            resumed = session_log.SessionLog(session_base)
+            resumed.render(".txt")
+            resumed.close()
 
-        # Preview last ~50 words
+        # Preview last ~50 words, read backwards from the end of the file
         try:
-            with open(chosen_txt, "r", encoding="utf-8") as f:
-                words = f.read().split()
-            preview = " ".join(words[-50:]) if words else "(empty file)"
+            words = session_index.tail_words(chosen_txt, 50)
+            preview = " ".join(words) if words else "(empty file)"
             ui.show_preview(preview)
         except Exception:
             print("\n(Preview unavailable)\n")
 
-        base_no_ext = os.path.splitext(recent[idx])[0]
-        session_base = os.path.join(sessions_dir, base_no_ext)
         run_recording_loop(session_file=session_base, new_session=False)
 
     else:
         print("Invalid choice.")
 
+def run_stream_mode(args):
+    """Non-interactive mode: transcribe audio from stdin or a FIFO, JSONL to stdout."""
+    raw_format = stream_transcribe.PcmFormat(args.rate, args.channels, args.sample_width)
+    log_debug(f"Stream mode: input={args.input or 'stdin'} chunk={args.chunk_seconds}s workers={args.workers}")
+
+    def transcribe(wav_bytes, filename):
+        return transcripter_latest.transcribe_bytes(wav_bytes, filename, model=args.model)
+
+    source = open(args.input, "rb") if args.input else sys.stdin.buffer
+    try:
+        stream_transcribe.stream_transcribe(
+            source,
+            transcribe,
+            chunk_seconds=args.chunk_seconds,
+            workers=args.workers,
+            raw_format=raw_format,
+        )
+    except stream_transcribe.ExportError as e:
+        log_debug(f"Stream mode: unreadable input: {e}")
+        sys.exit(1)
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Whisper dictation. Interactive unless --stdin or --input is given.")
+    parser.add_argument("--stdin", action="store_true", help="transcribe a WAV or raw PCM stream from stdin")
+    parser.add_argument("--input", help="read the stream from this file or FIFO instead of stdin")
+    parser.add_argument("--chunk-seconds", type=float, default=stream_transcribe.DEFAULT_CHUNK_SECONDS,
+                        help="audio per transcription request")
+    parser.add_argument("--workers", type=int, default=2, help="chunks transcribed concurrently")
+    parser.add_argument("--model", default="gpt-4o-mini-transcribe", help="transcription model")
+    parser.add_argument("--rate", type=int, default=16000, help="raw PCM sample rate (ignored for WAV input)")
+    parser.add_argument("--channels", type=int, default=1, help="raw PCM channel count (ignored for WAV input)")
+    parser.add_argument("--sample-width", type=int, default=2, help="raw PCM bytes per sample (ignored for WAV input)")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    main()
-    ui.print_session_concluded()
+    cli_args = parse_args()
+    if cli_args.stdin or cli_args.input:
+        run_stream_mode(cli_args)
+    else:
+        import ui
+        main()
+        ui.print_session_concluded()
@@ -0,0 +1,164 @@
+"""Streaming helpers for request and response bodies in ``RequestHandler``."""
+
+import re
+from typing import BinaryIO, Iterable, Iterator, Mapping, Optional
+
+STREAM_CHUNK_BYTES = 64 * 1024
+SNIFF_BYTES = 12
+_MAX_CHUNK_LINE = 1024
+_CHUNK_SIZE = re.compile(rb"[0-9A-Fa-f]+")
+
+
+class BodyError(ValueError):
+    """Malformed or unacceptable request body; ``status`` is the HTTP code to answer with."""
+
+    def __init__(self, message: str, status: int = 400) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def iter_request_body(
+    rfile: BinaryIO,
+    headers: Mapping[str, str],
+    max_bytes: int,
+    chunk_size: int = STREAM_CHUNK_BYTES,
+) -> Iterator[bytes]:
+    """
+    Yield the request body in pieces of at most ``chunk_size`` bytes.
+
+    Handles both ``Content-Length`` and ``Transfer-Encoding: chunked`` bodies
+    and never holds more than one piece in memory.
+    """
+    transfer_encoding = (headers.get("Transfer-Encoding") or "").lower()
+    if "chunked" in transfer_encoding:
+        yield from _iter_chunked(rfile, max_bytes, chunk_size)
+        return
+
+    length_header = headers.get("Content-Length")
+    if length_header is None:
+        raise BodyError("Content-Length or chunked Transfer-Encoding required", status=411)
+    try:
+        remaining = int(length_header)
+    except ValueError:
+        raise BodyError("Invalid Content-Length") from None
+    if remaining < 0:
+        raise BodyError("Invalid Content-Length")
+    if remaining > max_bytes:
+        raise BodyError(f"Body exceeds {max_bytes} bytes", status=413)
+
+    while remaining:
+        piece = rfile.read(min(chunk_size, remaining))
+        if not piece:
+            raise BodyError("Client closed connection mid-body")
+        remaining -= len(piece)
+        yield piece
+
+
+def _iter_chunked(rfile: BinaryIO, max_bytes: int, chunk_size: int) -> Iterator[bytes]:
+    total = 0
+    while True:
+        line = rfile.readline(_MAX_CHUNK_LINE)
+        if not line.endswith(b"\n"):
+            raise BodyError("Malformed chunk header")
+        # Bare hex digits only: int(..., 16) would also take "-5", "+5" and "0x5"
+        digits = line.split(b";", 1)[0].strip()
+        if not _CHUNK_SIZE.fullmatch(digits):
+            raise BodyError("Malformed chunk size")
+        size = int(digits, 16)
+        if size == 0:
+            # Discard trailers up to the terminating blank line
+            while rfile.readline(_MAX_CHUNK_LINE) not in (b"\r\n", b"\n", b""):
+                pass
+            return
+        total += size
+        if total > max_bytes:
+            raise BodyError(f"Body exceeds {max_bytes} bytes", status=413)
+        while size:
+            piece = rfile.read(min(chunk_size, size))
+            if not piece:
+                raise BodyError("Client closed connection mid-chunk")
+            size -= len(piece)
+            yield piece
+        if rfile.readline(_MAX_CHUNK_LINE) not in (b"\r\n", b"\n"):
+            raise BodyError("Missing CRLF after chunk")
+
+
+def sniff_audio_format(head: bytes) -> Optional[str]:
+    """File extension for a WAV, FLAC or Ogg stream, judged from its first bytes."""
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[:4] == b"OggS":
+        return "ogg"
+    return None
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """
+    Resolve a single ``Range: bytes=...`` header to an inclusive (start, end).
+
+    Returns None when the header is absent, not a bytes range, or asks for
+    several ranges; callers then serve the whole file, which RFC 9110 allows.
+    Raises RangeNotSatisfiable when the range lies outside the file.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable(header)
+            return max(0, size - suffix), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        raise RangeNotSatisfiable(header)
+    return start, min(end, size - 1)
+
+
+def parse_page_query(query: Mapping[str, list[str]], default_limit: int, max_limit: int) -> tuple[Optional[int], int]:
+    """
+    ``(before_id, limit)`` from a ``parse_qs`` result.
+
+    Raises ``ValueError`` for non-integers or a non-positive limit; a limit
+    above ``max_limit`` is capped.
+    """
+    before = query.get("before")
+    before_id = int(before[0]) if before else None
+    limit = int(query.get("limit", [str(default_limit)])[0])
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return before_id, min(limit, max_limit)
+
+
+def write_chunked(wfile: BinaryIO, pieces: Iterable[bytes], chunked: bool = True) -> int:
+    """
+    Write ``pieces`` as a ``Transfer-Encoding: chunked`` body and terminate it.
+
+    With ``chunked=False`` (HTTP/1.0 clients) the pieces are written raw and
+    the caller must close the connection to mark the end of the body.
+    Returns the number of payload bytes written.
+    """
+    written = 0
+    for piece in pieces:
+        if not piece:
+            continue  # an empty chunk would end the body early
+        if chunked:
+            wfile.write(b"%x\r\n%b\r\n" % (len(piece), piece))
+        else:
+            wfile.write(piece)
+        written += len(piece)
+    if chunked:
+        wfile.write(b"0\r\n\r\n")
+    return written
@@ -0,0 +1,155 @@
+# my_agents.py
+# Defines agents using the OpenAI Agent library, preserving original call signatures.
+# Calls run on the shared AgentRuntime: one event loop and client for the whole process.
+# Successful replies are cached (see agent_cache), so resending a transcript is free.
+
+from typing import Iterable, Iterator, Mapping, Optional
+
+import agent_cache
+import agent_runtime
+from agent_runtime import DEFAULT_MODEL, DEFAULT_SETTINGS, AgentResult, AgentSpec  # noqa: F401 - re-exported
+
+MONEYPENNY = agent_runtime.runtime().register(
+    AgentSpec(
+        name="Agent Moneypenny",
+        instructions="Take raw transcripts and respond directly.",
+    )
+)
+
+MAXWELL = agent_runtime.runtime().register(
+    AgentSpec(
+        name="Agent Maxwell",
+        instructions="Summarize transcripts into structured coding prompts.",
+    )
+)
+
+
+# Short names used by the web API (/api/agent/<key>)
+AGENTS = {"moneypenny": MONEYPENNY, "maxwell": MAXWELL}
+AGENTS_BY_NAME = {spec.name: spec for spec in AGENTS.values()}
+
+
+def _call(spec: AgentSpec, text: str) -> str:
+    cache = agent_cache.default_cache()
+    cached = cache.get(spec, text)
+    if cached is not None:
+        return cached
+    try:
+        reply = agent_runtime.runtime().run(spec.name, text)
+    except Exception as e:
+        return f"[ERROR calling {spec.name}: {e}]"
+    if reply:
+        cache.put(spec, text, reply)
+    return reply
+
+
+def _stream(spec: AgentSpec, text: str) -> Iterator[str]:
+    cache = agent_cache.default_cache()
+    cached = cache.get(spec, text)
+    if cached is not None:
+        yield cached
+        return
+    parts = []
+    try:
+        for delta in agent_runtime.runtime().stream(spec.name, text):
+            parts.append(delta)
+            yield delta
+    except Exception as e:
+        yield f"[ERROR calling {spec.name}: {e}]"
+        return
+    # Only a reply that streamed to completion is cached
+    reply = "".join(parts).strip()
+    if reply:
+        cache.put(spec, text, reply)
+
+
+def stream_agent(key: str, raw_text: str) -> Iterator[str]:
+    """Stream the reply of the agent registered under ``key`` in AGENTS."""
+    return _stream(AGENTS[key], raw_text)
+
+
+def fan_out(
+    keys: Iterable[str],
+    raw_text: str,
+    first: bool = False,
+    deadlines: Optional[Mapping[str, float]] = None,
+    timeout: Optional[float] = None,
+) -> list[AgentResult]:
+    """
+    Send one transcript to several agents (keys of AGENTS) at once.
+
+    Returns one AgentResult per key, in order, with per-agent timings.
+    ``first`` stops at the first successful reply; ``deadlines`` maps keys
+    to per-agent time limits in seconds, defaulting to ``timeout``.
+    Cached replies are returned without a call.
+    """
+    specs = [AGENTS[key] for key in keys]
+    cache = agent_cache.default_cache()
+    results: dict[str, AgentResult] = {}
+    for spec in specs:
+        cached = cache.get(spec, raw_text)
+        if cached is not None:
+            results[spec.name] = AgentResult(spec.name, cached, cached=True)
+    if first and results:
+        return [results.get(spec.name) or AgentResult(spec.name, status="cancelled") for spec in specs]
+
+    remaining = [spec for spec in specs if spec.name not in results]
+    if remaining:
+        limits = {AGENTS[key].name: limit for key, limit in deadlines.items()} if deadlines else None
+        for result in agent_runtime.runtime().fan_out(
+            [spec.name for spec in remaining], raw_text, first=first, deadlines=limits, timeout=timeout
+        ):
+            results[result.agent] = result
+            if result.ok and result.output:
+                cache.put(AGENTS_BY_NAME[result.agent], raw_text, result.output)
+    return [results[spec.name] for spec in specs]
+
+
+async def _acall(spec: AgentSpec, text: str) -> str:
+    cache = agent_cache.default_cache()
+    cached = cache.get(spec, text)
+    if cached is not None:
+        return cached
+    try:
+        reply = await agent_runtime.runtime().arun(spec.name, text)
+    except Exception as e:
+        return f"[ERROR calling {spec.name}: {e}]"
+    if reply:
+        cache.put(spec, text, reply)
+    return reply
+
+
+def agent_moneypenny(raw_text: str) -> str:
+    """
+    Pass raw transcript directly to a GPT agent.
+    Returns the model response as string.
+    """
+    return _call(MONEYPENNY, raw_text)
+
+
+def agent_maxwell(raw_text: str) -> str:
+    """
+    Coding-agent style summarization.
+    Returns a structured coding prompt.
+    """
+    return _call(MAXWELL, raw_text)
+
+
+async def agent_moneypenny_async(raw_text: str) -> str:
+    """Awaitable variant of agent_moneypenny for callers already on an event loop."""
+    return await _acall(MONEYPENNY, raw_text)
+
+
+async def agent_maxwell_async(raw_text: str) -> str:
+    """Awaitable variant of agent_maxwell for callers already on an event loop."""
+    return await _acall(MAXWELL, raw_text)
+
+
+def agent_moneypenny_stream(raw_text: str) -> Iterator[str]:
+    """Like agent_moneypenny, but yields the reply text as it is generated."""
+    return _stream(MONEYPENNY, raw_text)
+
+
+def agent_maxwell_stream(raw_text: str) -> Iterator[str]:
+    """Like agent_maxwell, but yields the reply text as it is generated."""
+    return _stream(MAXWELL, raw_text)
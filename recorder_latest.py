@@ -1,3 +1,4 @@
+import logging
 import os
 import queue
 import sounddevice as sd
@@ -5,19 +6,39 @@ import soundfile as sf
 import keyboard
 import io
 from datetime import datetime
-import threading
 import ui  # add near top with your other imports
+import metrics
+import tracing
+import whisp_logging
+
+WAV_BYTES_WRITTEN = metrics.counter("whisp_wav_bytes_written_total", "PCM bytes written to session WAV files.")
+CAPTURE_QUEUE_DEPTH = metrics.gauge("whisp_capture_queue_depth", "Audio blocks waiting in the capture queue.")
+CAPTURE_STATUS_FLAGS = metrics.ERRORS.labels("portaudio_status")
+
+log = whisp_logging.get_logger("recorder")
+# Overflow flags can fire on every block; log each distinct flag set at most every 5s
+_status_log = whisp_logging.RateLimitedLogger(log, interval=5.0)
+
+
+def _make_callback(q):
+    """PortAudio input callback that copies each block onto ``q``."""
+
+    def callback(indata, frames, time, status):
+        if status:
+            CAPTURE_STATUS_FLAGS.inc()
+            _status_log.log(logging.WARNING, str(status), "PortAudio status", flags=str(status), frames=frames)
+        q.put(indata.copy())
+
+    return callback
 
 
 def record_push_to_talk():
     q = queue.Queue()
     samplerate = 44100
     channels = 1
+    bytes_per_frame = channels * 2  # soundfile writes WAV as PCM_16 by default
 
-    def callback(indata, frames, time, status):
-        if status:
-            print(status)
-        q.put(indata.copy())
+    callback = _make_callback(q)
 
     os.makedirs("sessions", exist_ok=True)
     timestamp = datetime.now().strftime("%Y-%m-%d-%Hh-%Mm-recording")
@@ -26,40 +47,40 @@ def record_push_to_talk():
     ui.print_status("Press SPACE to record, BACKSPACE to stop.")
 
     last_state = None  # track last state for printing
-    run_flag = [False]  # used for spinner/timer thread
-    indicator_thread = None
-
-    with sf.SoundFile(wav_outpath, mode="w", samplerate=samplerate, channels=channels) as file:
-        with sd.InputStream(samplerate=samplerate, channels=channels, callback=callback):
-            while True:
-                if keyboard.is_pressed("backspace"):
-                    ui.print_recording_finished()
-                    if run_flag[0]:
-                        run_flag[0] = False
-                        if indicator_thread:
-                            indicator_thread.join()
-                    break
-
-                elif keyboard.is_pressed("space"):
-                    if last_state != "recording":
-                        last_state = "recording"
-                        # start spinner/timer if not already running
-                        if not run_flag[0]:
-                            run_flag[0] = True
-                            indicator_thread = threading.Thread(target=ui.record_indicator, args=(run_flag,))
-                            indicator_thread.start()
-                    file.write(q.get())
-
-                else:
-                    if last_state != "paused":
-                        last_state = "paused"
-                        ui.print_status("⏸️  Paused")
-                        # stop spinner/timer while paused
-                        if run_flag[0]:
-                            run_flag[0] = False
-                            if indicator_thread:
-                                indicator_thread.join()
-                    sd.sleep(200)  # throttle loop
+
+    file = sf.SoundFile(wav_outpath, mode="w", samplerate=samplerate, channels=channels)
+    try:
+        with tracing.span("recorder.capture"):
+            with sd.InputStream(samplerate=samplerate, channels=channels, callback=callback):
+                while True:
+                    if keyboard.is_pressed("backspace"):
+                        if last_state == "recording":
+                            ui.stop_record_indicator()
+                        ui.print_recording_finished()
+                        break
+
+                    elif keyboard.is_pressed("space"):
+                        if last_state != "recording":
+                            last_state = "recording"
+                            # spinner/timer are drawn by the shared renderer's ticker
+                            ui.start_record_indicator()
+                        block = q.get()
+                        file.write(block)
+                        WAV_BYTES_WRITTEN.inc(len(block) * bytes_per_frame)
+                        CAPTURE_QUEUE_DEPTH.set(q.qsize())
+
+                    else:
+                        if last_state != "paused":
+                            if last_state == "recording":
+                                ui.stop_record_indicator()
+                            last_state = "paused"
+                            ui.print_status("⏸️  Paused")
+                        sd.sleep(200)  # throttle loop
+    finally:
+        if last_state == "recording":  # interrupted mid-recording
+            ui.stop_record_indicator()
+        with tracing.span("recorder.flush"):
+            file.close()
 
     ui.print_success(f"Recording saved to {wav_outpath}")
     return wav_outpath
@@ -76,10 +97,7 @@ def record_chunks_push_to_talk(chunk_seconds=1, samplerate=44100, channels=1):
 
     q = queue.Queue()
 
-    def callback(indata, frames, time, status):
-        if status:
-            print(status)
-        q.put(indata.copy())
+    callback = _make_callback(q)
 
     print("Recording (live mode)... Hold SPACE, BACKSPACE to stop.")
 
@@ -0,0 +1,71 @@
+import threading
+from typing import Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one execution."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, "_Call"] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value
+
+
+class _Call:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResponseCache:
+    """
+    Keeps the last built response body per name.
+
+    A body is reused while its version key is unchanged; when the key moves
+    (for example after a transcript write) the next reader rebuilds it and
+    concurrent readers wait for that single build.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[str, tuple[Hashable, bytes]] = {}
+        self._flight = SingleFlight()
+
+    def get(self, name: str, version: Hashable, build: Callable[[], bytes]) -> bytes:
+        cached = self._entries.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        def rebuild() -> bytes:
+            body = build()
+            self._entries[name] = (version, body)
+            return body
+
+        return self._flight.do((name, version), rebuild)
@@ -0,0 +1,325 @@
+"""
+Stream a whole session out as one transcript and one WAV.
+
+The WAV is built without decoding anything: each snippet's RIFF header is
+parsed for its ``fmt `` chunk and PCM payload, a single header is written
+for the combined length, and the payloads are copied back to back.
+
+A session is either a name in the transcript store (web server uploads,
+backfill) or a CLI session under ``sessions/`` with a record log
+(``<name>.wlog``). Snippets are paged from the store or read sequentially
+from the log, so memory use does not depend on how long the session is.
+
+    python session_export.py 2025-10-03-14h-05m-session --audio out.wav --transcript out.txt
+"""
+
+import argparse
+import itertools
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator, NamedTuple, Optional
+
+import session_log
+from transcript_store import SQLiteTranscriptStore, TranscriptEntry
+
+SESSIONS_DIR = Path("sessions")
+COPY_CHUNK_BYTES = 64 * 1024
+PAGE_SIZE = 200
+_RIFF_MAX = 0xFFFFFFFF
+
+
+class ExportError(ValueError):
+    pass
+
+
+class WavInfo(NamedTuple):
+    fmt_chunk: bytes  # body of the ``fmt `` chunk, copied verbatim into the output
+    data_offset: int
+    data_size: int
+
+    @property
+    def channels(self) -> int:
+        return struct.unpack_from("<H", self.fmt_chunk, 2)[0]
+
+    @property
+    def samplerate(self) -> int:
+        return struct.unpack_from("<I", self.fmt_chunk, 4)[0]
+
+    @property
+    def block_align(self) -> int:
+        return struct.unpack_from("<H", self.fmt_chunk, 12)[0]
+
+    @property
+    def duration(self) -> float:
+        bytes_per_second = self.samplerate * self.block_align
+        return self.data_size / bytes_per_second if bytes_per_second else 0.0
+
+
+def read_wav_header(f: BinaryIO, file_size: Optional[int] = None) -> WavInfo:
+    """
+    Walk the RIFF chunks of ``f`` up to the start of ``data``.
+
+    Reads sequentially (no seeking), so it also works on pipes. A data size
+    of 0 or 0xFFFFFFFF (left by streaming writers) is clamped to the real
+    file size when ``file_size`` is known.
+    """
+    riff = f.read(12)
+    if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+        raise ExportError("not a RIFF/WAVE file")
+    offset = 12
+    fmt_chunk = None
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            raise ExportError("no data chunk")
+        chunk_id, chunk_size = header[:4], struct.unpack("<I", header[4:])[0]
+        offset += 8
+        if chunk_id == b"data":
+            if fmt_chunk is None:
+                raise ExportError("data chunk before fmt chunk")
+            if file_size is not None and (chunk_size in (0, _RIFF_MAX) or offset + chunk_size > file_size):
+                chunk_size = file_size - offset
+            return WavInfo(fmt_chunk, offset, chunk_size)
+        body = f.read(chunk_size + (chunk_size & 1))  # chunks are word aligned
+        if len(body) < chunk_size:
+            raise ExportError(f"truncated {chunk_id!r} chunk")
+        if chunk_id == b"fmt ":
+            fmt_chunk = body[:chunk_size]
+        offset += len(body)
+
+
+def build_wav_header(fmt_chunk: bytes, data_size: int) -> bytes:
+    fmt_padded = fmt_chunk + (b"\0" if len(fmt_chunk) & 1 else b"")
+    riff_size = 4 + 8 + len(fmt_padded) + 8 + data_size
+    if riff_size > _RIFF_MAX:
+        raise ExportError("combined audio exceeds the 4 GiB RIFF limit")
+    return b"".join(
+        (
+            b"RIFF",
+            struct.pack("<I", riff_size),
+            b"WAVE",
+            b"fmt ",
+            struct.pack("<I", len(fmt_chunk)),
+            fmt_padded,
+            b"data",
+            struct.pack("<I", data_size),
+        )
+    )
+
+
+class ExportItem(NamedTuple):
+    timestamp: str
+    text: str
+    audio_path: Optional[str]
+
+
+# A zero-argument callable returning a fresh pass over a session's snippets, oldest first
+Source = Callable[[], Iterator[ExportItem]]
+
+
+def iter_session_entries(
+    store: SQLiteTranscriptStore, session: str, upto_id: Optional[int] = None
+) -> Iterator[TranscriptEntry]:
+    """Entries of ``session`` in order, fetched a page at a time."""
+    after_id = 0
+    while True:
+        page = store.by_session(session, after_id=after_id, limit=PAGE_SIZE)
+        for entry in page:
+            if upto_id is not None and entry.id > upto_id:
+                return
+            yield entry
+        if len(page) < PAGE_SIZE:
+            return
+        after_id = page[-1].id
+
+
+def store_source(store: SQLiteTranscriptStore, session: str) -> Source:
+    """Snippets saved to the transcript store under ``session`` (web server and backfill)."""
+
+    def items() -> Iterator[ExportItem]:
+        for entry in iter_session_entries(store, session):
+            yield ExportItem(entry.timestamp, entry.transcript, entry.audio_path)
+
+    return items
+
+
+def find_session_log(name: str, root: Path = SESSIONS_DIR) -> Optional[Path]:
+    """
+    Base path of the CLI session called ``name``, in ``root`` or its YYYY/MM shards.
+
+    Names containing path separators or glob characters are refused.
+    """
+    if not name or name.startswith(".") or any(c in name for c in "/\\*?[]"):
+        return None
+    log_name = name + session_log.LOG_SUFFIX
+    logs = [path for path in (root / log_name, *root.glob(f"*/*/{log_name}")) if path.is_file()]
+    if not logs:
+        return None
+    newest = max(logs, key=lambda path: path.stat().st_mtime)
+    return newest.with_name(name)
+
+
+def log_source(base: Path) -> Source:
+    """Snippets of a CLI session, read from its record log (see session_log)."""
+
+    def items() -> Iterator[ExportItem]:
+        for record in session_log.read_records(base):
+            if record.get("kind") == "snippet":
+                yield ExportItem(record.get("timestamp", ""), record["enhanced"], record.get("audio_path"))
+
+    return items
+
+
+def session_source(store: Optional[SQLiteTranscriptStore], session: str, root: Path = SESSIONS_DIR) -> Optional[Source]:
+    """
+    Where ``session`` lives: the transcript store if it has entries under that
+    name, otherwise a CLI session log. None when neither exists; legacy CLI
+    sessions written before the record log (plain .txt/.md only) have no
+    per-snippet audio paths and cannot be exported.
+    """
+    if store is not None and store.by_session(session, limit=1):
+        return store_source(store, session)
+    base = find_session_log(session, root)
+    return log_source(base) if base is not None else None
+
+
+def iter_transcript(items: Iterable[ExportItem]) -> Iterator[bytes]:
+    for item in items:
+        yield f"[{item.timestamp}] {item.text.strip()}\n\n".encode("utf-8")
+
+
+class WavPlan(NamedTuple):
+    fmt_chunk: Optional[bytes]
+    data_size: int
+    count: int  # snippets examined; the streaming pass stops there
+    skipped: list[str]
+
+
+def _wav_info(path: Optional[Path]) -> Optional[WavInfo]:
+    if path is None:
+        return None
+    try:
+        with open(path, "rb") as f:
+            return read_wav_header(f, os.fstat(f.fileno()).st_size)
+    except (OSError, ExportError):
+        return None
+
+
+def _resolve(resolve: Callable[[str], Optional[Path]], audio_path: Optional[str]) -> Optional[Path]:
+    return resolve(audio_path) if audio_path else None
+
+
+def plan_wav(source: Source, resolve: Callable[[str], Optional[Path]] = Path) -> WavPlan:
+    """
+    First pass over the session's audio: pick the format and total the payload.
+
+    Only headers are read. Files that ``resolve`` rejects, that are not WAV,
+    or that do not match the first file's format are listed in ``skipped``
+    and left out of the export.
+    """
+    fmt_chunk = None
+    data_size = 0
+    count = 0
+    skipped = []
+    for item in source():
+        count += 1
+        info = _wav_info(_resolve(resolve, item.audio_path))
+        if info is None or (fmt_chunk is not None and info.fmt_chunk != fmt_chunk):
+            skipped.append(item.audio_path or "")
+            continue
+        fmt_chunk = info.fmt_chunk
+        data_size += info.data_size
+    return WavPlan(fmt_chunk, data_size, count, skipped)
+
+
+def iter_concat_wav(
+    source: Source,
+    plan: Optional[WavPlan] = None,
+    resolve: Callable[[str], Optional[Path]] = Path,
+) -> Iterator[bytes]:
+    """
+    Yield one WAV made of every compatible snippet from ``source``.
+
+    The header is written from ``plan`` (computed here when not given), so
+    snippets added after planning are ignored and the declared length always
+    matches what is streamed.
+    """
+    if plan is None:
+        plan = plan_wav(source, resolve)
+    if plan.fmt_chunk is None:
+        raise ExportError("session has no WAV audio")
+    yield build_wav_header(plan.fmt_chunk, plan.data_size)
+
+    remaining_total = plan.data_size
+    for item in itertools.islice(source(), plan.count):
+        path = _resolve(resolve, item.audio_path)
+        info = _wav_info(path)
+        if info is None or info.fmt_chunk != plan.fmt_chunk:
+            continue
+        remaining = min(info.data_size, remaining_total)
+        with open(path, "rb") as f:
+            f.seek(info.data_offset)
+            while remaining:
+                piece = f.read(min(COPY_CHUNK_BYTES, remaining))
+                if not piece:
+                    break
+                remaining -= len(piece)
+                remaining_total -= len(piece)
+                yield piece
+    # A file shrank between passes; pad with silence so the header stays truthful
+    while remaining_total:
+        pad = min(COPY_CHUNK_BYTES, remaining_total)
+        remaining_total -= pad
+        yield bytes(pad)
+
+
+def _write_stream(pieces: Iterator[bytes], target: str) -> int:
+    written = 0
+    out = sys.stdout.buffer if target == "-" else open(target, "wb")
+    try:
+        for piece in pieces:
+            out.write(piece)
+            written += len(piece)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    return written
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Export a session's transcript and combined audio.")
+    parser.add_argument("session", help="session name: a transcript-store session or a CLI session under sessions/")
+    parser.add_argument("--db", default=str(SESSIONS_DIR / "transcripts.db"), help="transcript database")
+    parser.add_argument("--audio", help="write the concatenated WAV here ('-' for stdout)")
+    parser.add_argument("--transcript", help="write the combined transcript here ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    if not args.audio and not args.transcript:
+        parser.error("nothing to do: pass --audio and/or --transcript")
+
+    store = SQLiteTranscriptStore(args.db) if Path(args.db).exists() else None
+    try:
+        source = session_source(store, args.session)
+        if source is None:
+            raise ExportError(f"unknown session {args.session!r}")
+        if args.transcript:
+            size = _write_stream(iter_transcript(source()), args.transcript)
+            print(f"Transcript: {size} bytes -> {args.transcript}", file=sys.stderr)
+        if args.audio:
+            plan = plan_wav(source)
+            size = _write_stream(iter_concat_wav(source, plan), args.audio)
+            print(f"Audio: {size} bytes -> {args.audio}", file=sys.stderr)
+            for path in plan.skipped:
+                print(f"  skipped (not a matching WAV): {path}", file=sys.stderr)
+    except ExportError as exc:
+        print(f"Export failed: {exc}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if store is not None:
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Index of dictation sessions for fast listing and previews.
+
+Every append to a session's ``.txt`` goes through ``record_append``, which
+keeps one row per session (mtime, snippet count, audio duration, byte size)
+in ``sessions/session_index.db``. Listing recent sessions is then an indexed
+``ORDER BY mtime DESC LIMIT n`` instead of a directory scan, and previews
+read backwards from the end of the file instead of loading all of it.
+
+Sessions may live in date-sharded subdirectories (``sessions/2025/10/...``);
+the index stores paths relative to the sessions root.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple, Optional, Union
+
+import whisp_logging
+from session_export import ExportError, read_wav_header
+from session_log import SessionLog
+
+SESSIONS_DIR = Path("sessions")
+INDEX_NAME = "session_index.db"
+SHARD_FORMAT = os.path.join("%Y", "%m")
+TAIL_BLOCK_BYTES = 4096
+_SCHEMA_VERSION = 1
+
+log = whisp_logging.get_logger("session_index")
+
+
+class SessionInfo(NamedTuple):
+    name: str
+    path: Path  # the session's .txt file
+    mtime: float
+    snippets: int
+    duration: float
+    bytes: int
+
+
+def shard_dir(root: Path = SESSIONS_DIR, when: Optional[datetime] = None) -> Path:
+    """Directory for sessions started at ``when``, e.g. ``sessions/2025/10``."""
+    return root / (when or datetime.now()).strftime(SHARD_FORMAT)
+
+
+def tail_words(path: Union[str, Path], count: int = 50, block_size: int = TAIL_BLOCK_BYTES) -> list[str]:
+    """
+    Last ``count`` words of a text file, reading backwards block by block.
+
+    Cost depends on ``count``, not on the file's size.
+    """
+    with open(path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        data = b""
+        position = end
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+            # One extra word guards against cutting the first one in half
+            if len(data.split()) > count:
+                break
+    words = data.decode("utf-8", errors="ignore").split()
+    if position > 0:
+        words = words[1:]
+    return words[-count:] if count else []
+
+
+class SessionIndex:
+    def __init__(self, root: Union[str, Path] = SESSIONS_DIR) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.root / INDEX_NAME), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                path TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                mtime REAL NOT NULL,
+                snippets INTEGER NOT NULL DEFAULT 0,
+                duration REAL NOT NULL DEFAULT 0,
+                bytes INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_mtime ON sessions (mtime DESC)")
+        self._conn.commit()
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+            # First use on an existing sessions/ tree: one full scan, never repeated
+            self.rebuild()
+
+    def _key(self, txt_path: Union[str, Path]) -> str:
+        path = Path(txt_path)
+        try:
+            return path.resolve().relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            return path.resolve().as_posix()
+
+    def record_append(self, txt_path: Union[str, Path], appended_bytes: int, duration: float = 0.0) -> None:
+        """Account for one snippet appended to ``txt_path``."""
+        key = self._key(txt_path)
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO sessions (path, name, mtime, snippets, duration, bytes) VALUES (?, ?, ?, 1, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    mtime = excluded.mtime,
+                    snippets = snippets + 1,
+                    duration = duration + excluded.duration,
+                    bytes = bytes + excluded.bytes
+                """,
+                (key, Path(key).stem, time.time(), duration, appended_bytes),
+            )
+            self._conn.commit()
+
+    def recent(self, limit: int = 5) -> list[SessionInfo]:
+        """
+        Most recently appended sessions; rows whose files have gone are pruned.
+
+        A session whose ``.txt`` has not been rendered yet (the recorder was
+        killed, or is still running elsewhere) is kept while its record log
+        exists; render the ``.txt`` from the log before reading it.
+        """
+        found: list[SessionInfo] = []
+        stale: list[str] = []
+        offset = 0
+        while len(found) < limit:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT path, name, mtime, snippets, duration, bytes FROM sessions "
+                    "ORDER BY mtime DESC LIMIT ? OFFSET ?",
+                    (limit, offset),
+                ).fetchall()
+            if not rows:
+                break
+            offset += len(rows)
+            for key, name, mtime, snippets, duration, size in rows:
+                path = self.root / key
+                if not path.exists() and not SessionLog.exists(path.with_suffix("")):
+                    stale.append(key)
+                    continue
+                found.append(SessionInfo(name, path, mtime, snippets, duration, size))
+        if stale:
+            with self._lock:
+                self._conn.executemany("DELETE FROM sessions WHERE path = ?", [(key,) for key in stale])
+                self._conn.commit()
+        return found[:limit]
+
+    def get(self, txt_path: Union[str, Path]) -> Optional[SessionInfo]:
+        key = self._key(txt_path)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, name, mtime, snippets, duration, bytes FROM sessions WHERE path = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return SessionInfo(row[1], self.root / row[0], row[2], row[3], row[4], row[5])
+
+    def rebuild(self) -> int:
+        """Re-index every ``.txt`` under the root (including shards); returns the count."""
+        rows = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if not filename.lower().endswith(".txt"):
+                    continue
+                path = Path(dirpath) / filename
+                try:
+                    stat = path.stat()
+                    with open(path, "rb") as f:
+                        snippets = sum(1 for line in f if line.strip() == b"---")
+                except OSError:
+                    continue
+                key = self._key(path)
+                rows.append((key, Path(key).stem, stat.st_mtime, snippets, 0.0, stat.st_size))
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions")
+            self._conn.executemany(
+                "INSERT INTO sessions (path, name, mtime, snippets, duration, bytes) VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            self._conn.commit()
+        return len(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_index: Optional[SessionIndex] = None
+_index_lock = threading.Lock()
+
+
+def default_index() -> SessionIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SessionIndex(SESSIONS_DIR)
+    return _index
+
+
+def record_append(txt_path: Union[str, Path], appended_bytes: int, audio_path: Optional[str] = None) -> None:
+    """
+    Update the default index after appending to ``txt_path``.
+
+    The snippet's duration is read from ``audio_path``'s WAV header when
+    given. Index failures are reported but never break the append.
+    """
+    duration = 0.0
+    if audio_path:
+        try:
+            with open(audio_path, "rb") as f:
+                duration = read_wav_header(f, os.fstat(f.fileno()).st_size).duration
+        except (OSError, ExportError):
+            pass
+    try:
+        default_index().record_append(txt_path, appended_bytes, duration)
+    except sqlite3.Error as exc:  # pragma: no cover - the index is an accelerator only
+        log.error("Session index update failed: %s", exc, extra={"path": str(txt_path)})
@@ -0,0 +1,271 @@
+"""
+Append-only, record-oriented session storage.
+
+A session ``sessions/<name>`` is stored as:
+
+``<name>.wlog``
+    Records, each a 4-byte big-endian length followed by UTF-8 JSON.
+``<name>.widx``
+    One 8-byte little-endian offset into the log per record, so record *i*
+    is two seeks away and the record count is ``size / 8``.
+
+The familiar ``.txt`` and ``.md`` files are renderings. They are brought up
+to date on demand by appending only the records added since the last
+render; ``<name>.render.json`` remembers how many records each file holds.
+
+Snippets keep the layout of the writer that produced them: the CLI session
+loop's (raw text in ``.txt``) by default, or with ``layout="transcript"``
+that of ``transcripter_latest.save_transcripts`` (enhanced text in
+``.txt``, the "Transcript Update" blocks in ``.md``).
+"""
+
+import json
+import os
+import struct
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Union
+
+LOG_SUFFIX = ".wlog"
+INDEX_SUFFIX = ".widx"
+RENDER_STATE_SUFFIX = ".render.json"
+_LENGTH = struct.Struct(">I")
+_OFFSET = struct.Struct("<Q")
+
+
+def render_txt(record: dict) -> str:
+    if record.get("kind") != "snippet":
+        return ""
+    if record.get("layout") == "transcript":
+        return record["enhanced"] + "\n" + "\n---\n\n"
+    return record["raw"].strip() + "\n---\n"
+
+
+def render_md(record: dict) -> str:
+    if record.get("layout") == "transcript":
+        audio_name = os.path.basename(record.get("audio_path") or "")
+        return (
+            f"# Transcript Update - {audio_name}\n\n"
+            f"**Generated:** {record['timestamp'].replace('T', ' ')}\n"
+            "**Enhanced:** Yes\n\n"
+            "---\n\n"
+            "**Raw Whisper Output**\n\n"
+            f"{record['raw']}\n\n"
+            "**Enhanced Transcript**\n\n"
+            f"{record['enhanced']}\n\n"
+            "---------------------------\n\n"
+        )
+    if record.get("kind") == "agent":
+        return (
+            f"## {record['agent']}\n"
+            "### User Transcript\n"
+            f"{record['prompt'].strip()}\n\n"
+            "### Agent Reply\n"
+            f"{record['reply']}\n"
+            "---\n"
+        )
+    return (
+        "## Raw Transcript\n"
+        f"{record['raw'].strip()}\n\n"
+        "## Enhanced Transcript\n"
+        f"{record['enhanced'].strip()}\n"
+        "---\n"
+    )
+
+
+RENDERERS: dict[str, Callable[[dict], str]] = {".txt": render_txt, ".md": render_md}
+
+
+class SessionLog:
+    def __init__(self, base: Union[str, Path]) -> None:
+        """``base`` is the session path without extension, e.g. ``sessions/2025/10/standup``."""
+        self.base = Path(base)
+        self.log_path = self.base.with_name(self.base.name + LOG_SUFFIX)
+        self.index_path = self.base.with_name(self.base.name + INDEX_SUFFIX)
+        self._lock = threading.Lock()
+        self.base.parent.mkdir(parents=True, exist_ok=True)
+        self._log = open(self.log_path, "a+b")
+        self._index = open(self.index_path, "a+b")
+        self._recover()
+
+    @staticmethod
+    def exists(base: Union[str, Path]) -> bool:
+        base = Path(base)
+        return base.with_name(base.name + LOG_SUFFIX).exists()
+
+    def _recover(self) -> None:
+        """Re-index records written after the last index entry; drop a torn final record."""
+        index_size = self._index.seek(0, os.SEEK_END)
+        if index_size % _OFFSET.size:
+            index_size -= index_size % _OFFSET.size
+            self._index.truncate(index_size)
+        log_size = self._log.seek(0, os.SEEK_END)
+        position = 0
+        if index_size:
+            self._index.seek(index_size - _OFFSET.size)
+            last = _OFFSET.unpack(self._index.read(_OFFSET.size))[0]
+            self._log.seek(last)
+            header = self._log.read(_LENGTH.size)
+            position = last + _LENGTH.size + _LENGTH.unpack(header)[0] if len(header) == _LENGTH.size else last
+            if position > log_size:
+                # The last indexed record itself is torn
+                position = last
+                index_size -= _OFFSET.size
+                self._index.truncate(index_size)
+        offsets = []
+        while position < log_size:
+            self._log.seek(position)
+            header = self._log.read(_LENGTH.size)
+            if len(header) < _LENGTH.size:
+                break
+            end = position + _LENGTH.size + _LENGTH.unpack(header)[0]
+            if end > log_size:
+                break
+            offsets.append(position)
+            position = end
+        if position < log_size:
+            self._log.truncate(position)
+        if offsets:
+            self._index.seek(0, os.SEEK_END)
+            self._index.write(b"".join(_OFFSET.pack(offset) for offset in offsets))
+            self._index.flush()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._index.seek(0, os.SEEK_END) // _OFFSET.size
+
+    def append(self, record: dict) -> int:
+        """Write ``record`` (a timestamp is added if missing); returns its position."""
+        record.setdefault("timestamp", datetime.now().isoformat(timespec="seconds"))
+        payload = json.dumps(record, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            offset = self._log.seek(0, os.SEEK_END)
+            # Log first, index second: a crash in between is repaired by _recover
+            self._log.write(_LENGTH.pack(len(payload)) + payload)
+            self._log.flush()
+            position = self._index.seek(0, os.SEEK_END) // _OFFSET.size
+            self._index.write(_OFFSET.pack(offset))
+            self._index.flush()
+        return position
+
+    def append_snippet(
+        self, raw: str, enhanced: str, audio_path: Optional[str] = None, layout: Optional[str] = None
+    ) -> int:
+        record = {"kind": "snippet", "raw": raw, "enhanced": enhanced, "audio_path": audio_path}
+        if layout is not None:
+            record["layout"] = layout
+        return self.append(record)
+
+    def append_agent_reply(self, agent: str, prompt: str, reply: str) -> int:
+        return self.append({"kind": "agent", "agent": agent, "prompt": prompt, "reply": reply})
+
+    def __getitem__(self, position: int) -> dict:
+        with self._lock:
+            count = self._index.seek(0, os.SEEK_END) // _OFFSET.size
+            if position < 0:
+                position += count
+            if not 0 <= position < count:
+                raise IndexError("session record out of range")
+            self._index.seek(position * _OFFSET.size)
+            offset = _OFFSET.unpack(self._index.read(_OFFSET.size))[0]
+            self._log.seek(offset)
+            length = _LENGTH.unpack(self._log.read(_LENGTH.size))[0]
+            payload = self._log.read(length)
+        return json.loads(payload)
+
+    def iter_from(self, start: int = 0) -> Iterator[dict]:
+        """Records from ``start`` on, read sequentially from that record's offset."""
+        with self._lock:
+            count = self._index.seek(0, os.SEEK_END) // _OFFSET.size
+            if start >= count:
+                return
+            self._index.seek(start * _OFFSET.size)
+            position = _OFFSET.unpack(self._index.read(_OFFSET.size))[0]
+        for _ in range(start, count):
+            with self._lock:
+                self._log.seek(position)
+                length = _LENGTH.unpack(self._log.read(_LENGTH.size))[0]
+                payload = self._log.read(length)
+            position += _LENGTH.size + length
+            yield json.loads(payload)
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.iter_from(0)
+
+    def snippets(self, last: Optional[int] = None) -> list[dict]:
+        """The most recent ``last`` snippet records (all when None), oldest first."""
+        found: list[dict] = []
+        position = len(self) - 1
+        while position >= 0 and (last is None or len(found) < last):
+            record = self[position]
+            if record.get("kind") == "snippet":
+                found.append(record)
+            position -= 1
+        return found[::-1]
+
+    def render(self, suffix: str) -> Path:
+        """
+        Bring ``<base><suffix>`` up to date and return its path.
+
+        Only records added since the previous render are formatted and
+        appended, so this costs O(new records). Text already in the file
+        (hand edits, or sessions written before the log existed) is kept.
+        """
+        renderer = RENDERERS[suffix]
+        target = self.base.with_name(self.base.name + suffix)
+        state_path = self.base.with_name(self.base.name + RENDER_STATE_SUFFIX)
+        with self._lock:
+            rendered = read_state(state_path).get(suffix, 0)
+        if rendered >= len(self):
+            return target
+        chunks = [renderer(record) for record in self.iter_from(rendered)]
+        with open(target, "a", encoding="utf-8") as f:
+            f.write("".join(chunks))
+        with self._lock:
+            write_state(state_path, {**read_state(state_path), suffix: rendered + len(chunks)})
+        return target
+
+    def render_all(self) -> tuple[Path, Path]:
+        return self.render(".txt"), self.render(".md")
+
+    def close(self) -> None:
+        with self._lock:
+            self._log.close()
+            self._index.close()
+
+
+def read_records(base: Union[str, Path]) -> Iterator[dict]:
+    """
+    Records of the session at ``base``, read sequentially without opening it for writing.
+
+    Safe while another process is appending: a record still being written
+    ends the iteration instead of being repaired (``SessionLog`` would
+    truncate it).
+    """
+    base = Path(base)
+    with open(base.with_name(base.name + LOG_SUFFIX), "rb") as f:
+        while True:
+            header = f.read(_LENGTH.size)
+            if len(header) < _LENGTH.size:
+                return
+            length = _LENGTH.unpack(header)[0]
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            yield json.loads(payload)
+
+
+def read_state(path: Path) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def write_state(path: Path, state: dict) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
@@ -0,0 +1,170 @@
+"""
+Rolling summary of a session, so agent prompts stay the same size.
+
+Agents are sent the session summary plus the last few snippets verbatim
+instead of the whole history. The summary only ever absorbs snippets that
+have dropped out of that recent window, and each update summarizes just
+those new snippets together with the previous summary; nothing is
+re-read from the start of the session.
+
+State lives next to the session log in ``<name>.memory.json``:
+``{"summary": str, "upto": n}``, where ``n`` is the log position up to which
+snippets are folded into the summary.
+
+Both the prompt and each summarizer call are bounded even when the
+summarizer fails or falls behind: updates fold at most ``FOLD_SNIPPETS``
+snippets per call, and ``context`` sends at most that many unsummarized
+snippets on top of the recent window, dropping the oldest.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Optional
+
+import agent_runtime
+import whisp_logging
+from agent_runtime import AgentSpec
+from session_log import SessionLog, read_state, write_state
+
+MEMORY_SUFFIX = ".memory.json"
+RECENT_SNIPPETS = 3
+FOLD_SNIPPETS = 8
+SUMMARY_MAX_WORDS = 250
+
+SUMMARIZER = agent_runtime.runtime().register(
+    AgentSpec(
+        name="Session Summarizer",
+        instructions=(
+            "You maintain the running summary of a dictation session. You are given the current "
+            "summary and new transcript snippets. Return only the updated summary: keep decisions, "
+            f"open questions, names and numbers, drop filler, and stay under {SUMMARY_MAX_WORDS} words."
+        ),
+    )
+)
+
+log = whisp_logging.get_logger("session_memory")
+
+
+def summarize_delta(summary: str, snippets: list[str]) -> str:
+    """Fold ``snippets`` into ``summary`` with one call to the summarizer agent."""
+    prompt = (
+        "Current summary:\n"
+        f"{summary or '(none yet)'}\n\n"
+        "New snippets, oldest first:\n"
+        + "\n\n".join(snippets)
+    )
+    return agent_runtime.runtime().run(SUMMARIZER.name, prompt)
+
+
+def _clip(text: str, max_words: int) -> str:
+    words = text.split()
+    return text.strip() if len(words) <= max_words else " ".join(words[:max_words]) + " …"
+
+
+class SessionMemory:
+    """
+    Keeps ``<session>.memory.json`` current as snippets are appended.
+
+    ``refresh`` is cheap to call after every append: updates run one at a
+    time on a background thread and are no-ops until a snippet leaves the
+    recent window. ``context`` builds the agent prompt.
+    """
+
+    def __init__(
+        self,
+        records: SessionLog,
+        summarize: Callable[[str, list[str]], str] = summarize_delta,
+        recent: int = RECENT_SNIPPETS,
+        max_words: int = SUMMARY_MAX_WORDS,
+        fold: int = FOLD_SNIPPETS,
+    ) -> None:
+        self._records = records
+        self._summarize = summarize
+        self._recent = recent
+        self._fold = fold
+        self._max_words = max_words
+        self._path = records.base.with_name(records.base.name + MEMORY_SUFFIX)
+        state = read_state(self._path)
+        self._summary: str = state.get("summary", "")
+        self._upto: int = state.get("upto", 0)
+        self._lock = threading.Lock()
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-memory")
+        self._last: Optional[Future] = None
+
+    @property
+    def summary(self) -> str:
+        with self._lock:
+            return self._summary
+
+    def refresh(self) -> Future:
+        """Schedule folding any snippets that left the recent window into the summary."""
+        future = self._worker.submit(self._update)
+        self._last = future
+        return future
+
+    def _update(self) -> None:
+        with self._lock:
+            summary, upto = self._summary, self._upto
+        snippets = [
+            (position, record)
+            for position, record in enumerate(self._records.iter_from(upto), start=upto)
+            if record.get("kind") == "snippet"
+        ]
+        pending = snippets[:-self._recent] if self._recent else snippets
+        # Oldest first and a batch at a time, so a failing call is retried at the same size
+        for start in range(0, len(pending), self._fold):
+            fold = pending[start:start + self._fold]
+            try:
+                summary = self._summarize(summary, [record["raw"].strip() for _, record in fold])
+            except Exception:
+                log.exception("Session summary update failed", extra={"session": self._records.base.name})
+                return  # the same batch is retried on the next refresh
+            with self._lock:
+                self._summary = summary = _clip(summary, self._max_words)
+                self._upto = fold[-1][0] + 1
+                write_state(self._path, {"summary": self._summary, "upto": self._upto})
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait for the latest scheduled update; a slow summarizer only delays, never fails, callers."""
+        if self._last is None:
+            return
+        try:
+            self._last.result(timeout)
+        except FutureTimeoutError:
+            log.warning("Session summary still updating; using the previous one", extra={"timeout": timeout})
+
+    def context(self, text: str, timeout: Optional[float] = 30.0) -> str:
+        """
+        The prompt for an agent asked about ``text`` (normally the newest snippet).
+
+        Early in a session, with nothing summarized and no earlier snippets,
+        this is ``text`` itself. At most ``recent + fold`` earlier snippets
+        are included however far behind the summary is.
+        """
+        self.wait(timeout)
+        with self._lock:
+            summary, upto = self._summary, self._upto
+        earlier = [
+            record["raw"].strip()
+            for record in self._records.iter_from(upto)
+            if record.get("kind") == "snippet"
+        ]
+        if earlier and earlier[-1] == text.strip():
+            earlier.pop()
+        # Snippets the summary has not caught up with yet are capped too
+        earlier = earlier[-(self._recent + self._fold):]
+        if not summary and not earlier:
+            return text
+        parts = []
+        if summary:
+            parts.append(f"Summary of the session so far:\n{summary}")
+        if earlier:
+            parts.append("Most recent snippets, oldest first:\n" + "\n\n".join(earlier))
+        parts.append(f"Latest snippet:\n{text.strip()}")
+        return "\n\n".join(parts)
+
+    def close(self) -> None:
+        """Finish any pending update so the summary is saved for the next run."""
+        self._worker.shutdown(wait=True)
+
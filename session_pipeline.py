@@ -0,0 +1,137 @@
+"""
+Background transcription for the interactive CLI session.
+
+``flow.run_recording_loop`` hands each finished recording to ``submit`` and
+goes straight back to recording. Transcription runs on a small thread pool;
+a single appender thread writes kept snippets to the session files strictly
+in recording order, each one as soon as it is transcribed and the user has
+decided to keep it.
+"""
+
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+class Snippet:
+    __slots__ = ("index", "audio_path", "future", "decided", "kept", "appended", "result", "error")
+
+    def __init__(self, index: int, audio_path: str, future: Future) -> None:
+        self.index = index
+        self.audio_path = audio_path
+        self.future = future
+        self.decided = threading.Event()
+        self.kept = False
+        self.appended = threading.Event()  # set once written, discarded or failed
+        self.result: Optional[tuple[str, str]] = None
+        self.error: Optional[BaseException] = None
+
+
+class SessionPipeline:
+    """
+    Transcribe recordings concurrently, append them in order.
+
+    ``transcribe(audio_path)`` returns ``(raw, enhanced)``;
+    ``append(raw, enhanced, audio_path)`` writes one snippet to the session
+    and is only ever called from the appender thread.
+    """
+
+    def __init__(
+        self,
+        transcribe: Callable[[str], tuple[str, str]],
+        append: Callable[[str, str, str], None],
+        on_error: Optional[Callable[[Snippet, BaseException], None]] = None,
+        workers: int = 2,
+    ) -> None:
+        self._transcribe = transcribe
+        self._append = append
+        self._on_error = on_error
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="snippet-transcribe")
+        self._ordered: "queue.Queue[Optional[Snippet]]" = queue.Queue()
+        self._completed: "queue.SimpleQueue[Snippet]" = queue.SimpleQueue()
+        self._count = 0
+        self._outstanding = 0
+        self._undecided: set[Snippet] = set()
+        self._lock = threading.Lock()
+        self._appender = threading.Thread(target=self._run_appender, name="snippet-appender", daemon=True)
+        self._appender.start()
+
+    def submit(self, audio_path: str) -> Snippet:
+        """Start transcribing ``audio_path``; call ``keep`` or ``discard`` on the result."""
+        self._count += 1
+        snippet = Snippet(self._count, audio_path, self._pool.submit(self._transcribe, audio_path))
+        with self._lock:
+            self._outstanding += 1
+            self._undecided.add(snippet)
+        self._ordered.put(snippet)
+        return snippet
+
+    def keep(self, snippet: Snippet) -> None:
+        snippet.kept = True
+        self._decide(snippet)
+
+    def discard(self, snippet: Snippet) -> None:
+        snippet.future.cancel()  # no-op if the request is already on the wire
+        self._decide(snippet)
+
+    def _decide(self, snippet: Snippet) -> None:
+        with self._lock:
+            self._undecided.discard(snippet)
+        snippet.decided.set()
+
+    def wait(self, snippet: Snippet) -> Snippet:
+        """Block until ``snippet`` (and so every earlier one) has been handled."""
+        snippet.appended.wait()
+        return snippet
+
+    def completed(self) -> list[Snippet]:
+        """Kept snippets handled since the last call, in order; for display on the main thread."""
+        done = []
+        while True:
+            try:
+                done.append(self._completed.get_nowait())
+            except queue.Empty:
+                return done
+
+    def pending(self) -> int:
+        """Snippets submitted but not yet written or dropped."""
+        with self._lock:
+            return self._outstanding
+
+    def close(self) -> None:
+        """
+        Wait for every submitted snippet to be written, then stop the workers.
+
+        Snippets still awaiting a keep/discard decision (e.g. after Ctrl+C)
+        are kept rather than lost.
+        """
+        with self._lock:
+            undecided = list(self._undecided)
+        for snippet in undecided:
+            self.keep(snippet)
+        self._ordered.put(None)
+        self._appender.join()
+        self._pool.shutdown(wait=True)
+
+    def _run_appender(self) -> None:
+        while True:
+            snippet = self._ordered.get()
+            if snippet is None:
+                return
+            try:
+                snippet.decided.wait()
+                if not snippet.kept:
+                    continue
+                try:
+                    snippet.result = snippet.future.result()
+                    self._append(snippet.result[0], snippet.result[1], snippet.audio_path)
+                except Exception as exc:
+                    snippet.error = exc
+                    if self._on_error is not None:
+                        self._on_error(snippet, exc)
+                self._completed.put(snippet)
+            finally:
+                with self._lock:
+                    self._outstanding -= 1
+                snippet.appended.set()
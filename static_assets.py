@@ -0,0 +1,131 @@
+import gzip
+import hashlib
+import mimetypes
+import zlib
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Optional
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+_COMPRESSIBLE_PREFIXES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(_COMPRESSIBLE_PREFIXES)
+
+
+def compress(body: bytes, encoding: str, level: int = 6) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    if encoding == "deflate":
+        return zlib.compress(body, level)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick gzip or deflate from an Accept-Encoding header, honouring q=0."""
+    if not accept_encoding:
+        return None
+    accepted = set()
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(token)
+    for encoding in ("gzip", "deflate"):
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+class StaticAsset:
+    __slots__ = ("body", "gzip_body", "content_type", "etag", "last_modified", "mtime", "cache_control")
+
+    def __init__(self, body: bytes, content_type: str, mtime: float, cache_control: str) -> None:
+        self.body = body
+        self.content_type = content_type
+        self.mtime = int(mtime)
+        self.last_modified = formatdate(self.mtime, usegmt=True)
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        self.cache_control = cache_control
+        self.gzip_body: Optional[bytes] = None
+        if is_compressible(content_type):
+            compressed = compress(body, "gzip", level=9)
+            if len(compressed) < len(body):
+                self.gzip_body = compressed
+
+    def not_modified(self, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+        if if_none_match:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return self.etag in tags or "*" in tags
+        if if_modified_since:
+            try:
+                return parsedate_to_datetime(if_modified_since).timestamp() >= self.mtime
+            except (TypeError, ValueError):
+                return False
+        return False
+
+
+class StaticAssets:
+    """
+    In-memory cache of the browser UI and everything under ``assets/``.
+
+    Each asset is reachable at its plain URL (revalidated via ETag) and at a
+    content-fingerprinted URL such as ``/assets/css/theme.1a2b3c4d5e.css``
+    that is cached for a year. The index page is rewritten to reference the
+    fingerprinted URLs, so a deploy only invalidates what actually changed.
+    """
+
+    def __init__(self, root: Path, index_name: str, assets_dir: str = "assets") -> None:
+        self._root = root
+        self._index_name = index_name
+        self._assets_dir = assets_dir
+        self._assets: dict[str, StaticAsset] = {}
+
+    def load(self) -> None:
+        assets: dict[str, StaticAsset] = {}
+        rewrites: dict[str, str] = {}
+
+        assets_root = self._root / self._assets_dir
+        if assets_root.is_dir():
+            for path in sorted(p for p in assets_root.rglob("*") if p.is_file()):
+                relative = path.relative_to(self._root).as_posix()
+                body = path.read_bytes()
+                content_type = _guess_type(path)
+                mtime = path.stat().st_mtime
+                fingerprint = hashlib.sha256(body).hexdigest()[:10]
+                fingerprinted = f"{path.with_suffix('').relative_to(self._root).as_posix()}.{fingerprint}{path.suffix}"
+                assets["/" + relative] = StaticAsset(body, content_type, mtime, REVALIDATE_CACHE_CONTROL)
+                assets["/" + fingerprinted] = StaticAsset(body, content_type, mtime, IMMUTABLE_CACHE_CONTROL)
+                rewrites[relative] = "/" + fingerprinted
+
+        index_path = self._root / self._index_name
+        if index_path.is_file():
+            html = index_path.read_text(encoding="utf-8")
+            for original, fingerprinted in rewrites.items():
+                html = html.replace(f'"{original}"', f'"{fingerprinted}"')
+            index = StaticAsset(
+                html.encode("utf-8"), "text/html; charset=utf-8", index_path.stat().st_mtime, REVALIDATE_CACHE_CONTROL
+            )
+            assets["/"] = index
+            assets["/index.html"] = index
+
+        self._assets = assets
+
+    def get(self, path: str) -> Optional[StaticAsset]:
+        return self._assets.get(path)
+
+
+def _guess_type(path: Path) -> str:
+    content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type in ("application/javascript", "image/svg+xml"):
+        content_type += "; charset=utf-8"
+    return content_type
@@ -0,0 +1,161 @@
+"""
+Incremental transcription of a PCM or WAV byte stream.
+
+Audio is read from any binary stream (stdin, a FIFO, a file) in fixed-length
+chunks, each chunk is wrapped in a WAV header and transcribed on a small
+thread pool, and results are emitted strictly in order as JSON lines:
+
+    {"type": "partial", "index": 0, "start": 0.0, "end": 10.0, "text": "..."}
+    {"type": "final", "chunks": 3, "duration": 27.4, "text": "..."}
+
+At most ``workers + 1`` chunks are held in memory at once, so input of any
+length runs in bounded memory and as fast as the API allows rather than in
+real time.
+"""
+
+import json
+import struct
+import sys
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Callable, Iterator, NamedTuple, Optional, TextIO
+
+from session_export import ExportError, build_wav_header, read_wav_header
+
+DEFAULT_CHUNK_SECONDS = 10.0
+_STREAMING_SIZES = (0, 0xFFFFFFFF)  # data sizes left by writers that did not know the length
+
+
+class PcmFormat(NamedTuple):
+    samplerate: int = 16000
+    channels: int = 1
+    sample_width: int = 2
+
+    @property
+    def block_align(self) -> int:
+        return self.channels * self.sample_width
+
+    def fmt_chunk(self) -> bytes:
+        return struct.pack(
+            "<HHIIHH",
+            1,  # WAVE_FORMAT_PCM
+            self.channels,
+            self.samplerate,
+            self.samplerate * self.block_align,
+            self.block_align,
+            self.sample_width * 8,
+        )
+
+
+class _Prefixed:
+    """Replays already-consumed bytes before reading on from ``stream``."""
+
+    def __init__(self, prefix: bytes, stream: BinaryIO) -> None:
+        self._prefix = prefix
+        self._stream = stream
+
+    def read(self, size: int) -> bytes:
+        if self._prefix:
+            piece, self._prefix = self._prefix[:size], self._prefix[size:]
+            return piece
+        return self._stream.read(size)
+
+
+def _read_exactly(stream, size: int) -> bytes:
+    """Read ``size`` bytes, fewer only at end of stream; pipes return short reads."""
+    parts = []
+    while size:
+        piece = stream.read(size)
+        if not piece:
+            break
+        parts.append(piece)
+        size -= len(piece)
+    return b"".join(parts)
+
+
+def open_audio(stream: BinaryIO, raw_format: PcmFormat = PcmFormat()) -> tuple[bytes, int, Optional[int], object]:
+    """
+    Work out what ``stream`` carries.
+
+    Returns ``(fmt_chunk, block_align, data_size, reader)``: WAV input is
+    recognised from its RIFF header, anything else is treated as raw PCM in
+    ``raw_format``. ``data_size`` is None when the length is unknown.
+    """
+    head = _read_exactly(stream, 12)
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        info = read_wav_header(_Prefixed(head, stream))
+        data_size = None if info.data_size in _STREAMING_SIZES else info.data_size
+        return info.fmt_chunk, info.block_align, data_size, stream
+    return raw_format.fmt_chunk(), raw_format.block_align, None, _Prefixed(head, stream)
+
+
+def iter_wav_chunks(
+    stream: BinaryIO, chunk_seconds: float = DEFAULT_CHUNK_SECONDS, raw_format: PcmFormat = PcmFormat()
+) -> Iterator[tuple[bytes, float]]:
+    """Yield ``(wav_bytes, seconds)`` for consecutive chunks of the stream."""
+    fmt_chunk, block_align, remaining, reader = open_audio(stream, raw_format)
+    samplerate = struct.unpack_from("<I", fmt_chunk, 4)[0]
+    bytes_per_second = samplerate * block_align
+    chunk_bytes = max(block_align, int(chunk_seconds * samplerate) * block_align)
+    while remaining is None or remaining > 0:
+        want = chunk_bytes if remaining is None else min(chunk_bytes, remaining)
+        pcm = _read_exactly(reader, want)
+        pcm = pcm[: len(pcm) - len(pcm) % block_align]  # drop a torn final frame
+        if not pcm:
+            return
+        if remaining is not None:
+            remaining -= len(pcm)
+        yield build_wav_header(fmt_chunk, len(pcm)) + pcm, len(pcm) / bytes_per_second
+
+
+def stream_transcribe(
+    stream: BinaryIO,
+    transcribe: Callable[[bytes, str], str],
+    out: TextIO = sys.stdout,
+    chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+    workers: int = 2,
+    raw_format: PcmFormat = PcmFormat(),
+) -> str:
+    """
+    Transcribe ``stream`` chunk by chunk, writing JSONL to ``out``; returns the full text.
+
+    Chunks are transcribed concurrently but reported in input order. A chunk
+    that fails yields an ``error`` line and is left out of the final text.
+    """
+    pending: deque[tuple[int, float, float, Future]] = deque()
+    texts: list[str] = []
+    position = 0.0
+
+    def emit(record: dict) -> None:
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+    def drain_one() -> None:
+        index, start, end, future = pending.popleft()
+        try:
+            text = future.result()
+        except Exception as exc:
+            emit({"type": "error", "index": index, "start": start, "end": end, "error": str(exc)})
+            return
+        texts.append(text)
+        emit({"type": "partial", "index": index, "start": start, "end": end, "text": text})
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stream-transcribe") as pool:
+            for index, (wav_bytes, seconds) in enumerate(iter_wav_chunks(stream, chunk_seconds, raw_format)):
+                start, position = position, position + seconds
+                pending.append(
+                    (index, round(start, 3), round(position, 3), pool.submit(transcribe, wav_bytes, f"chunk_{index}.wav"))
+                )
+                # Report finished chunks promptly; block only when the window is full
+                while pending and (pending[0][3].done() or len(pending) > workers):
+                    drain_one()
+            while pending:
+                drain_one()
+    except ExportError as exc:
+        emit({"type": "error", "error": f"unreadable audio: {exc}"})
+        raise
+
+    full_text = " ".join(text for text in texts if text)
+    emit({"type": "final", "chunks": len(texts), "duration": round(position, 3), "text": full_text})
+    return full_text
@@ -0,0 +1,23 @@
+import agent_cache
+from agent_runtime import AgentSpec
+
+SPEC = AgentSpec(name="Agent Test", instructions="Reply.")
+
+
+def test_fillers_case_and_whitespace_share_a_key():
+    assert agent_cache.cache_key(SPEC, "Um, so  we SHIP uh today") == agent_cache.cache_key(SPEC, "so we ship today")
+
+
+def test_words_that_look_like_fillers_are_kept():
+    key = agent_cache.cache_key
+    assert key(SPEC, "cut the board to 5 mm") != key(SPEC, "cut the board to 5")
+    assert key(SPEC, "take him to the ER now") != key(SPEC, "take him to the now")
+    assert key(SPEC, "err on the side of caution") != key(SPEC, "on the side of caution")
+    assert agent_cache.normalize("umbrella uhura") == "umbrella uhura"
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = agent_cache.AgentCache(None, memory_entries=2)
+    for text in ("a", "b", "c"):
+        cache.put(SPEC, text, text.upper())
+    assert [cache.get(SPEC, text) for text in ("a", "b", "c")] == [None, "B", "C"]
@@ -0,0 +1,36 @@
+import io
+
+import pytest
+
+import http_io
+
+
+def test_page_query_defaults_and_caps_limit():
+    assert http_io.parse_page_query({}, 50, 200) == (None, 50)
+    assert http_io.parse_page_query({"before": ["7"], "limit": ["1000"]}, 50, 200) == (7, 200)
+
+
+@pytest.mark.parametrize("limit", ["0", "-1"])
+def test_page_query_rejects_non_positive_limit(limit):
+    with pytest.raises(ValueError):
+        http_io.parse_page_query({"limit": [limit]}, 50, 200)
+
+
+@pytest.mark.parametrize("query", [{"limit": ["ten"]}, {"before": ["x"]}])
+def test_page_query_rejects_non_integers(query):
+    with pytest.raises(ValueError):
+        http_io.parse_page_query(query, 50, 200)
+
+
+@pytest.mark.parametrize("size", [b"-5", b"+5", b"0x5", b" ", b"5 5"])
+def test_chunked_body_rejects_malformed_size(size):
+    body = io.BytesIO(size + b"\r\n" + b"x" * 100_000)
+    pieces = http_io.iter_request_body(body, {"Transfer-Encoding": "chunked"}, max_bytes=10)
+    with pytest.raises(http_io.BodyError, match="Malformed chunk size"):
+        next(pieces)
+
+
+def test_chunked_body_reads_hex_sizes():
+    body = io.BytesIO(b"a;ext=1\r\n0123456789\r\n0\r\n\r\n")
+    pieces = http_io.iter_request_body(body, {"Transfer-Encoding": "chunked"}, max_bytes=10)
+    assert b"".join(pieces) == b"0123456789"
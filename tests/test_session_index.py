@@ -0,0 +1,15 @@
+import session_index
+from session_log import SessionLog
+
+
+def test_recent_keeps_logged_session_without_txt(tmp_path):
+    index = session_index.SessionIndex(tmp_path)
+    records = SessionLog(tmp_path / "crashed")
+    records.append_snippet("raw", "enhanced")
+    records.close()
+    index.record_append(tmp_path / "crashed.txt", 10)
+    index.record_append(tmp_path / "deleted.txt", 10)
+
+    assert [info.name for info in index.recent()] == ["crashed"]
+    assert index.get(tmp_path / "deleted.txt") is None
+    index.close()
@@ -0,0 +1,37 @@
+import session_memory
+from session_log import SessionLog
+
+
+def _log(tmp_path, count):
+    records = SessionLog(tmp_path / "demo")
+    for i in range(count):
+        records.append_snippet(f"snippet {i} " + "word " * 50, f"snippet {i}")
+    return records
+
+
+def test_context_stays_bounded_when_summarizer_fails(tmp_path):
+    def failing(summary, snippets):
+        raise RuntimeError("summarizer down")
+
+    records = _log(tmp_path, 40)
+    memory = session_memory.SessionMemory(records, summarize=failing, recent=3, fold=4)
+    memory.refresh()
+    prompt = memory.context("latest")
+    memory.close()
+    assert prompt.count("snippet ") == 7
+    assert "snippet 39 " in prompt and "snippet 32 " not in prompt
+
+
+def test_update_folds_in_bounded_batches(tmp_path):
+    calls = []
+
+    def summarize(summary, snippets):
+        calls.append(len(snippets))
+        return f"{summary} +{len(snippets)}"
+
+    records = _log(tmp_path, 13)
+    memory = session_memory.SessionMemory(records, summarize=summarize, recent=3, fold=4)
+    memory.refresh().result()
+    memory.close()
+    assert calls == [4, 4, 2]
+    assert memory.summary == "+4 +4 +2"
@@ -0,0 +1,184 @@
+"""
+Lightweight per-snippet tracing.
+
+A ``Trace`` collects timed spans for one snippet as it moves from key-down
+to stored transcript. The active trace travels through a context variable,
+so lower layers such as ``recorder_latest`` can open spans without knowing
+who started the trace; when no trace is active ``span()`` is a no-op.
+
+Finished traces are written as Chrome trace events (``ph: "X"``) to a
+rotating file under ``sessions/traces``. Open it in chrome://tracing or
+ui.perfetto.dev.
+"""
+
+import contextvars
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Iterator, Optional
+
+import whisp_logging
+
+TRACE_PATH = Path("sessions") / "traces" / "whisp-trace.json"
+TRACE_MAX_BYTES = 5 * 1024 * 1024
+TRACE_BACKUPS = 3
+
+_current: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("whisp_trace", default=None)
+_trace_ids = itertools.count(1)
+_NO_SPAN = nullcontext()
+
+log = whisp_logging.get_logger("tracing")
+
+
+class Span:
+    __slots__ = ("name", "start", "end", "thread_id", "attrs")
+
+    def __init__(self, name: str, start: float, thread_id: int, attrs: dict) -> None:
+        self.name = name
+        self.start = start
+        self.end: Optional[float] = None
+        self.thread_id = thread_id
+        self.attrs = attrs
+
+
+class Trace:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.trace_id = next(_trace_ids)
+        self._wall_start = time.time()
+        self._perf_start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._spans: list[Span] = []
+        self._finished = False
+
+    @contextmanager
+    def span(self, name: str, **attrs) -> Iterator[Span]:
+        span = Span(name, time.perf_counter(), threading.get_ident(), attrs)
+        try:
+            yield span
+        finally:
+            span.end = time.perf_counter()
+            with self._lock:
+                self._spans.append(span)
+
+    def record(self, name: str, start: float, end: float, **attrs) -> None:
+        """Add a span timed elsewhere; ``start``/``end`` are ``time.perf_counter()`` readings."""
+        span = Span(name, start, threading.get_ident(), attrs)
+        span.end = end
+        with self._lock:
+            self._spans.append(span)
+
+    def breakdown(self) -> dict[str, float]:
+        """Milliseconds per span name (repeats summed) plus the elapsed total."""
+        timings: dict[str, float] = {}
+        with self._lock:
+            spans = list(self._spans)
+        for span in spans:
+            timings[span.name] = timings.get(span.name, 0.0) + (span.end - span.start) * 1000
+        timings["total"] = (time.perf_counter() - self._perf_start) * 1000
+        return {name: round(ms, 1) for name, ms in timings.items()}
+
+    def finish(self) -> None:
+        """Hand the trace to the background writer; later calls are ignored."""
+        with self._lock:
+            if self._finished:
+                return
+            self._finished = True
+            spans = list(self._spans)
+        events = []
+        for span in spans:
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": self.name,
+                    "ph": "X",
+                    "ts": int((self._wall_start + span.start - self._perf_start) * 1_000_000),
+                    "dur": int((span.end - span.start) * 1_000_000),
+                    "pid": os.getpid(),
+                    "tid": span.thread_id,
+                    "args": {"trace_id": self.trace_id, **span.attrs},
+                }
+            )
+        writer().submit(events)
+
+
+def current() -> Optional[Trace]:
+    return _current.get()
+
+
+@contextmanager
+def use(trace: Optional[Trace]) -> Iterator[Optional[Trace]]:
+    """Make ``trace`` the active trace for the current thread/context."""
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+def span(name: str, **attrs):
+    trace = _current.get()
+    if trace is None:
+        return _NO_SPAN
+    return trace.span(name, **attrs)
+
+
+class TraceWriter:
+    """Appends Chrome trace events to a size-rotated file from a background thread."""
+
+    def __init__(self, path: Path, max_bytes: int = TRACE_MAX_BYTES, backups: int = TRACE_BACKUPS) -> None:
+        self._path = Path(path)
+        self._max_bytes = max_bytes
+        self._backups = backups
+        self._queue: "queue.SimpleQueue[list[dict]]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, events: list[dict]) -> None:
+        if events:
+            self._queue.put(events)
+
+    def _run(self) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        while True:
+            events = self._queue.get()
+            try:
+                self._write(events)
+            except OSError as exc:  # pragma: no cover - tracing must never break the pipeline
+                log.error("Trace write failed: %s", exc)
+
+    def _write(self, events: list[dict]) -> None:
+        if self._path.exists() and self._path.stat().st_size >= self._max_bytes:
+            self._rotate()
+        new_file = not self._path.exists()
+        with open(self._path, "a", encoding="utf-8") as f:
+            # Array format without the closing bracket; trace viewers accept the open array
+            if new_file:
+                f.write("[\n")
+            for event in events:
+                f.write(json.dumps(event, separators=(",", ":")) + ",\n")
+
+    def _rotate(self) -> None:
+        for index in range(self._backups - 1, 0, -1):
+            source = self._path.with_suffix(f".{index}.json")
+            if source.exists():
+                os.replace(source, self._path.with_suffix(f".{index + 1}.json"))
+        os.replace(self._path, self._path.with_suffix(".1.json"))
+
+
+_writer: Optional[TraceWriter] = None
+_writer_lock = threading.Lock()
+
+
+def writer() -> TraceWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = TraceWriter(TRACE_PATH)
+    return _writer
@@ -0,0 +1,320 @@
+import itertools
+import json
+import sqlite3
+import threading
+from collections.abc import Sequence
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
+
+import whisp_logging
+
+_CHUNK_SIZE = 256
+
+log = whisp_logging.get_logger("store")
+
+
+class TranscriptEntry:
+    """One transcribed snippet. Slotted to keep large histories compact."""
+
+    __slots__ = ("id", "transcript", "audio_path", "mocked", "timestamp", "session", "_json")
+
+    def __init__(
+        self,
+        id: int,
+        transcript: str,
+        audio_path: str,
+        mocked: bool,
+        timestamp: str,
+        session: Optional[str] = None,
+    ) -> None:
+        self.id = id
+        self.transcript = transcript
+        self.audio_path = audio_path
+        self.mocked = mocked
+        self.timestamp = timestamp
+        self.session = session
+        self._json: Optional[bytes] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "transcript": self.transcript,
+            "audio_path": self.audio_path,
+            "mocked": self.mocked,
+            "timestamp": self.timestamp,
+            "session": self.session,
+        }
+
+    def to_json(self) -> bytes:
+        """UTF-8 JSON for this entry, encoded once and reused by every response."""
+        if self._json is None:
+            self._json = json.dumps(self.to_dict()).encode("utf-8")
+        return self._json
+
+    def __repr__(self) -> str:
+        return f"TranscriptEntry(id={self.id!r}, audio_path={self.audio_path!r}, mocked={self.mocked!r})"
+
+
+class HistorySnapshot(Sequence):
+    """
+    Immutable view over the first ``length`` entries of a chunked history.
+
+    Chunks are only ever appended to, so the entries below a published
+    length never change and the view can be read without locking.
+    """
+
+    __slots__ = ("_chunks", "_length")
+
+    def __init__(self, chunks: list[list[TranscriptEntry]], length: int) -> None:
+        self._chunks = chunks
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("history index out of range")
+        return self._chunks[index // _CHUNK_SIZE][index % _CHUNK_SIZE]
+
+    def __iter__(self) -> Iterator[TranscriptEntry]:
+        remaining = self._length
+        for chunk in self._chunks:
+            if remaining <= 0:
+                return
+            if remaining >= len(chunk):
+                yield from chunk
+            else:
+                yield from itertools.islice(chunk, remaining)
+            remaining -= len(chunk)
+
+
+class TranscriptStore:
+    """
+    In-memory transcript history; lost on restart.
+
+    Writers serialize on ``_lock``; readers take a snapshot of the published
+    length and never block.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._chunks: list[list[TranscriptEntry]] = []
+        self._length = 0
+
+    def add(self, transcript: str, audio_path: str, mocked: bool, session: Optional[str] = None) -> TranscriptEntry:
+        with self._lock:
+            entry = TranscriptEntry(
+                self._length + 1, transcript, audio_path, mocked, datetime.utcnow().isoformat(), session
+            )
+            if not self._chunks or len(self._chunks[-1]) == _CHUNK_SIZE:
+                self._chunks.append([])
+            entry.to_json()
+            self._chunks[-1].append(entry)
+            # Publish only after the entry is in place
+            self._length += 1
+        return entry
+
+    def all(self) -> HistorySnapshot:
+        return HistorySnapshot(self._chunks, self._length)
+
+    def get(self, entry_id: int) -> Optional[TranscriptEntry]:
+        snapshot = self.all()
+        if 1 <= entry_id <= len(snapshot):
+            return snapshot[entry_id - 1]
+        return None
+
+    def page(self, before_id: Optional[int] = None, limit: int = 50) -> list[TranscriptEntry]:
+        snapshot = self.all()
+        end = len(snapshot) if before_id is None else max(0, min(before_id - 1, len(snapshot)))
+        return snapshot[max(0, end - limit):end]
+
+    def close(self) -> None:
+        return
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    session TEXT,
+    audio_path TEXT NOT NULL,
+    transcript TEXT NOT NULL,
+    mocked INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_timestamp ON entries(timestamp);
+CREATE INDEX IF NOT EXISTS idx_entries_session ON entries(session, id);
+CREATE INDEX IF NOT EXISTS idx_entries_audio_path ON entries(audio_path);
+"""
+
+_COLUMNS = "id, transcript, audio_path, mocked, timestamp, session"
+
+
+def history_json(entries: Iterable[TranscriptEntry]) -> bytes:
+    """Assemble a JSON array from the entries' cached fragments."""
+    return b"[" + b", ".join(entry.to_json() for entry in entries) + b"]"
+
+
+def _row_to_entry(row: tuple) -> TranscriptEntry:
+    return TranscriptEntry(row[0], row[1], row[2], bool(row[3]), row[4], row[5])
+
+
+class SQLiteTranscriptStore:
+    """
+    Durable transcript history backed by SQLite in WAL mode.
+
+    Only the most recent ``hot_size`` entries stay in memory, published as a
+    tuple that is replaced (never mutated) on each write so readers need no
+    lock; older entries are paged from disk. Inserts are buffered and written in batches, either
+    once ``batch_size`` rows are pending or every ``flush_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        hot_size: int = 200,
+        batch_size: int = 32,
+        flush_interval: float = 0.5,
+    ) -> None:
+        self._db_path = Path(db_path)
+        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._hot_size = hot_size
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self._db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        # Restart cost is a single indexed read of the hot window
+        rows = self._conn.execute(
+            f"SELECT {_COLUMNS} FROM entries ORDER BY id DESC LIMIT ?", (hot_size,)
+        ).fetchall()
+        self._hot: tuple[TranscriptEntry, ...] = tuple(_row_to_entry(row) for row in reversed(rows))
+        self._next_id = (rows[0][0] + 1) if rows else 1
+        self._pending: list[tuple] = []
+
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, name="transcript-store-flush", daemon=True)
+        self._flusher.start()
+
+    def add(self, transcript: str, audio_path: str, mocked: bool, session: Optional[str] = None) -> TranscriptEntry:
+        with self._lock:
+            entry = TranscriptEntry(
+                self._next_id, transcript, audio_path, mocked, datetime.utcnow().isoformat(), session
+            )
+            self._next_id += 1
+            entry.to_json()
+            self._hot = self._hot[len(self._hot) + 1 - self._hot_size:] + (entry,)
+            self._pending.append(
+                (entry.id, transcript, audio_path, int(mocked), entry.timestamp, session)
+            )
+            if len(self._pending) >= self._batch_size:
+                self._wake.set()
+        return entry
+
+    def all(self) -> tuple[TranscriptEntry, ...]:
+        """Return the in-memory hot window, oldest first."""
+        return self._hot
+
+    def get(self, entry_id: int) -> Optional[TranscriptEntry]:
+        hot = self._hot
+        if hot and hot[0].id <= entry_id <= hot[-1].id:
+            return hot[entry_id - hot[0].id]
+        self.flush()
+        return self._fetch_one(f"SELECT {_COLUMNS} FROM entries WHERE id = ?", (entry_id,))
+
+    def find_by_audio_path(self, audio_path: str) -> Optional[TranscriptEntry]:
+        self.flush()
+        return self._fetch_one(
+            f"SELECT {_COLUMNS} FROM entries WHERE audio_path = ? ORDER BY id DESC LIMIT 1", (audio_path,)
+        )
+
+    def transcribed_audio_paths(self) -> set[str]:
+        """Audio paths with at least one real (non-mocked) transcript, in one query."""
+        self.flush()
+        rows = self._fetch_all("SELECT DISTINCT audio_path FROM entries WHERE mocked = 0", ())
+        return {row[0] for row in rows}
+
+    def page(self, before_id: Optional[int] = None, limit: int = 50) -> list[TranscriptEntry]:
+        """Return up to ``limit`` entries older than ``before_id``, oldest first."""
+        self.flush()
+        if before_id is None:
+            sql = f"SELECT {_COLUMNS} FROM entries ORDER BY id DESC LIMIT ?"
+            params: tuple = (limit,)
+        else:
+            sql = f"SELECT {_COLUMNS} FROM entries WHERE id < ? ORDER BY id DESC LIMIT ?"
+            params = (before_id, limit)
+        return [_row_to_entry(row) for row in reversed(self._fetch_all(sql, params))]
+
+    def by_session(self, session: str, after_id: int = 0, limit: int = 500) -> list[TranscriptEntry]:
+        self.flush()
+        rows = self._fetch_all(
+            f"SELECT {_COLUMNS} FROM entries WHERE session = ? AND id > ? ORDER BY id LIMIT ?",
+            (session, after_id, limit),
+        )
+        return [_row_to_entry(row) for row in rows]
+
+    def between(self, start: str, end: str, limit: int = 500) -> list[TranscriptEntry]:
+        """Entries whose ISO timestamp falls in ``[start, end)``."""
+        self.flush()
+        rows = self._fetch_all(
+            f"SELECT {_COLUMNS} FROM entries WHERE timestamp >= ? AND timestamp < ? ORDER BY timestamp LIMIT ?",
+            (start, end, limit),
+        )
+        return [_row_to_entry(row) for row in rows]
+
+    def flush(self) -> None:
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        try:
+            with self._db_lock:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO entries (id, transcript, audio_path, mocked, timestamp, session) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        batch,
+                    )
+        except sqlite3.Error:
+            with self._lock:
+                self._pending[:0] = batch
+            raise
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._flusher.join(timeout=5)
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+    def _flush_loop(self) -> None:
+        while not self._closed:
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as exc:  # pragma: no cover - keep buffering and retry next tick
+                log.error("Transcript store flush failed: %s", exc, extra={"pending": len(self._pending)})
+
+    def _fetch_one(self, sql: str, params: tuple) -> Optional[TranscriptEntry]:
+        with self._db_lock:
+            row = self._conn.execute(sql, params).fetchone()
+        return _row_to_entry(row) if row else None
+
+    def _fetch_all(self, sql: str, params: tuple) -> list[tuple]:
+        with self._db_lock:
+            return self._conn.execute(sql, params).fetchall()
@@ -1,11 +1,18 @@
 import os
 from datetime import datetime, timezone
 from openai import OpenAI
-import sys, time
-from rich.console import Console
 import io
 
-console = Console()
+import metrics
+import session_index
+import session_log
+import tracing
+import ui
+
+UPLOAD_BYTES = metrics.counter("whisp_upload_bytes_total", "Audio bytes uploaded to the transcription API.")
+TRANSCRIPTION_SECONDS = metrics.histogram(
+    "whisp_transcription_api_seconds", "Transcription API call latency.", ("model",)
+)
 
 
 # Create a client
@@ -17,15 +24,21 @@ def transcribe_and_enhance(audio_path):
     Returns (raw_transcript, enhanced_transcript).
     """
     with open(audio_path, "rb") as audio_file:
-        transcript = client.audio.transcriptions.create(
-            model="whisper-1",
-            file=audio_file
-        )
+        UPLOAD_BYTES.inc(os.fstat(audio_file.fileno()).st_size)
+        try:
+            with TRANSCRIPTION_SECONDS.labels("whisper-1").time(), tracing.span("transcription.api"):
+                transcript = client.audio.transcriptions.create(
+                    model="whisper-1",
+                    file=audio_file
+                )
+        except Exception:
+            metrics.ERRORS.labels("transcription").inc()
+            raise
     raw_text = transcript.text.strip()
 
-with open("sessions/transcripts.log", "a", encoding="utf-8") as log_file:
-    timestamp = datetime.now(timezone.utc).isoformat()
-    log_file.write(f"[{timestamp}] {audio_path} :: {raw_text}\n")
+    with open("sessions/transcripts.log", "a", encoding="utf-8") as log_file:
+        timestamp = datetime.now(timezone.utc).isoformat()
+        log_file.write(f"[{timestamp}] {audio_path} :: {raw_text}\n")
 
 
     # Enhance with GPT
@@ -44,31 +57,41 @@ def save_transcripts(session_file, raw_text, enhanced_text, audio_file):
     """
     Saves raw and enhanced transcripts into a .md debug log,
     and appends only enhanced text into the rolling .txt session file.
+
+    The snippet is appended to the session's record log and both files are
+    rendered from it incrementally, in the same layout as before.
     """
     base_name = os.path.splitext(session_file)[0]
-    md_path = base_name + ".md"
-    txt_path = base_name + ".txt"
-
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    # Write MD log (debugging)
-    with open(md_path, "a", encoding="utf-8") as f:
-        f.write(f"# Transcript Update - {os.path.basename(audio_file)}\n\n")
-        f.write(f"**Generated:** {timestamp}\n")
-        f.write(f"**Enhanced:** Yes\n\n")
-        f.write("---\n\n")
-        f.write("**Raw Whisper Output**\n\n")
-        f.write(raw_text + "\n\n")
-        f.write("**Enhanced Transcript**\n\n")
-        f.write(enhanced_text + "\n\n")
-        f.write("---------------------------\n\n")
-
-    # Write rolling TXT (user log)
-    with open(txt_path, "a", encoding="utf-8") as f:
-        f.write(enhanced_text + "\n")
-        f.write("\n---\n\n")
-
-    return md_path, txt_path
+    log = session_log.SessionLog(base_name)
+    try:
+        log.append_snippet(raw_text, enhanced_text, audio_file, layout="transcript")
+        txt_path, md_path = log.render_all()
+    finally:
+        log.close()
+    txt_entry = session_log.render_txt({"kind": "snippet", "layout": "transcript", "enhanced": enhanced_text})
+    session_index.record_append(txt_path, len(txt_entry.encode("utf-8")), audio_file)
+
+    return str(md_path), str(txt_path)
+
+def transcribe_bytes(audio_bytes, filename="chunk.wav", model="gpt-4o-mini-transcribe", language="en"):
+    """
+    Transcribe an in-memory audio clip; ``filename``'s extension tells the API its format.
+    Thread-safe: the shared client pools its connections.
+    """
+    audio_file = io.BytesIO(audio_bytes)
+    audio_file.name = filename
+    UPLOAD_BYTES.inc(len(audio_bytes))
+    try:
+        with TRANSCRIPTION_SECONDS.labels(model).time(), tracing.span("transcription.api"):
+            transcript = client.audio.transcriptions.create(
+                model=model,
+                file=audio_file,
+                language=language
+            )
+    except Exception:
+        metrics.ERRORS.labels("transcription").inc()
+        raise
+    return transcript.text.strip()
 
 # ===============================
 # Experimental Live Transcription
@@ -82,27 +105,14 @@ def live_transcribe(stream_generator, chunk_seconds=1):
     
     Prints and yields partial transcripts as chunks are processed.
     """
-    
-
-    for i, chunk in enumerate(stream_generator):
-        audio_file = io.BytesIO(chunk)
-        audio_file.name = f"chunk_{i}.wav"
-
-        try:
-            transcript = client.audio.transcriptions.create(
-                model="gpt-4o-mini-transcribe",
-                file=audio_file,
-                language="en"
-            )
-            partial_text = transcript.text.strip()
-        except Exception as e:
-            partial_text = f"[Error on chunk {i}: {e}]"
-
-        # Pretty-print rolling text in green, typewriter style
-        for char in partial_text + "\n":
-            console.print(char, style="green", end="")
-            sys.stdout.flush()
-            time.sleep(0.01)
-
-        yield partial_text
+    # Rolling text is drawn in frames by the shared renderer, never per character
+    with ui.renderer.live():
+        for i, chunk in enumerate(stream_generator):
+            try:
+                partial_text = transcribe_bytes(chunk, f"chunk_{i}.wav")
+            except Exception as e:
+                partial_text = f"[Error on chunk {i}: {e}]"
+
+            ui.renderer.write(partial_text + "\n")
+            yield partial_text
 
@@ -0,0 +1,144 @@
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+import metrics
+import tracing
+
+QUEUE_DEPTH = metrics.gauge("whisp_transcription_queue_depth", "Transcription jobs waiting for a worker.")
+QUEUE_WAIT_SECONDS = metrics.histogram("whisp_transcription_queue_wait_seconds", "Time jobs spent queued.")
+IN_FLIGHT = metrics.gauge("whisp_transcriptions_in_flight", "Transcriptions currently running.")
+REJECTED = metrics.counter("whisp_transcription_rejected_total", "Jobs refused because the queue was full.")
+SHED = metrics.counter("whisp_transcription_shed_total", "Jobs dropped before running.", ("reason",))
+
+
+class QueueFullError(RuntimeError):
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Transcription queue is full")
+        self.retry_after = retry_after
+
+
+class JobShedError(RuntimeError):
+    pass
+
+
+class TranscriptionJob:
+    __slots__ = ("audio_path", "trace", "deadline", "abandoned", "enqueued_at", "future", "cancelled")
+
+    def __init__(
+        self,
+        audio_path: str,
+        trace: Optional[tracing.Trace],
+        deadline: float,
+        abandoned: Optional[Callable[[], bool]],
+    ) -> None:
+        self.audio_path = audio_path
+        self.trace = trace
+        self.deadline = deadline
+        self.abandoned = abandoned
+        self.enqueued_at = time.perf_counter()
+        self.future: "Future[tuple[str, bool]]" = Future()
+        self.cancelled = False
+
+
+class TranscriptionQueue:
+    """
+    Bounded pool of transcription workers.
+
+    ``submit`` refuses work once ``max_depth`` jobs are waiting, so a slow
+    transcription API turns into fast 429s instead of piling up blocked
+    request threads. Jobs whose deadline has passed, whose caller cancelled
+    them, or whose client disconnected are dropped before they run.
+    """
+
+    def __init__(self, transcribe: Callable[[str], tuple[str, bool]], workers: int = 2, max_depth: int = 8) -> None:
+        self._transcribe = transcribe
+        self._workers = workers
+        self._queue: "queue.Queue[TranscriptionJob]" = queue.Queue(maxsize=max_depth)
+        self._threads: list[threading.Thread] = []
+        self._start_lock = threading.Lock()
+        # Smoothed service time, used for Retry-After estimates
+        self._service_seconds = 1.0
+        QUEUE_DEPTH.set_function(self._queue.qsize)
+
+    def submit(
+        self,
+        audio_path: str,
+        trace: Optional[tracing.Trace] = None,
+        timeout: float = 120.0,
+        abandoned: Optional[Callable[[], bool]] = None,
+    ) -> TranscriptionJob:
+        self._ensure_started()
+        job = TranscriptionJob(audio_path, trace, time.monotonic() + timeout, abandoned)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            REJECTED.inc()
+            raise QueueFullError(self.retry_after()) from None
+        return job
+
+    def wait(self, job: TranscriptionJob) -> tuple[str, bool]:
+        """Block until ``job`` finishes; on timeout it is cancelled and raises TimeoutError."""
+        try:
+            return job.future.result(timeout=max(0.0, job.deadline - time.monotonic()))
+        except TimeoutError:
+            job.cancelled = True
+            raise
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def retry_after(self) -> int:
+        backlog = self._queue.qsize() + self._workers
+        return max(1, math.ceil(backlog * self._service_seconds / self._workers))
+
+    def _ensure_started(self) -> None:
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            for index in range(self._workers):
+                thread = threading.Thread(target=self._run, name=f"transcription-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            dequeued = time.perf_counter()
+            QUEUE_WAIT_SECONDS.observe(dequeued - job.enqueued_at)
+            if job.trace is not None:
+                job.trace.record("transcription.queue_wait", job.enqueued_at, dequeued)
+
+            reason = self._shed_reason(job, time.monotonic())
+            if reason:
+                SHED.labels(reason).inc()
+                job.future.set_exception(JobShedError(f"Transcription dropped: {reason}"))
+                continue
+
+            IN_FLIGHT.inc()
+            try:
+                with tracing.use(job.trace), tracing.span("run_transcription"):
+                    result = self._transcribe(job.audio_path)
+            except Exception as exc:
+                job.future.set_exception(exc)
+            else:
+                job.future.set_result(result)
+            finally:
+                IN_FLIGHT.dec()
+                elapsed = time.perf_counter() - dequeued
+                self._service_seconds = 0.8 * self._service_seconds + 0.2 * elapsed
+
+    @staticmethod
+    def _shed_reason(job: TranscriptionJob, now: float) -> Optional[str]:
+        if job.cancelled:
+            return "cancelled"
+        if now >= job.deadline:
+            return "expired"
+        if job.abandoned is not None and job.abandoned():
+            return "client_gone"
+        return None
@@ -2,12 +2,11 @@
 # Presentation-only functions for Whisper Dictation CLI
 # Width set to 45 characters, green font for consistency
 
-import sys
-import time
-from rich.console import Console
-from rich.markdown import Markdown
-import itertools
+import threading
 import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from rich.console import Console, Group
 from rich.live import Live
 from rich.text import Text
 
@@ -42,7 +41,8 @@ def menu_post_record() -> str:
     print("[3] Keep and record another snippet")
     print("[4] Copy last snippet to clipboard and exit")
     print("[5] Copy last snippet to clipboard and record another")
-    print("[6] Send transcript to GPT-4o (STUBBED)\n")
+    print("[6] Send transcript to GPT-4o (STUBBED)")
+    print("[7] Send transcript to every agent at once\n")
     divider()
     return input("User Selection: ").strip()
 
@@ -64,40 +64,162 @@ def snippet_recording_banner():
     print("Hold SPACE bar to record. Press BACKSPACE when done.\n")
 
 
-def pretty_print_response(text: str, delay: float = 0.01):
+# Frame-batched live rendering
+DEFAULT_FPS = 15
+SPINNER = ("|", "/", "-", "\\")
+SPINNER_FPS = 10
+
+
+class RenderEngine:
     """
-    Nicely formats the agent response in green with typewriter effect.
-    Uses rich to handle markdown (##, **, etc).
+    One ``rich.live.Live`` display shared by everything that animates.
+
+    Producers call ``write`` from any thread; it only appends to a buffer,
+    so a streaming agent or transcriber never waits on the terminal. A
+    single ticker thread turns the buffer into at most ``fps`` frames per
+    second: completed lines are printed once above the live region and only
+    the trailing partial line (plus the spinner/timer indicator, if shown)
+    is redrawn. Per-frame cost is therefore independent of how much text
+    has streamed.
+
+    The display is active while at least one ``live()`` block or indicator
+    is open.
     """
-    md = Markdown(text)
 
+    def __init__(self, console: Console, fps: int = DEFAULT_FPS) -> None:
+        self._console = console
+        self._interval = 1.0 / fps
+        self._lock = threading.Lock()
+        self._pending: list[tuple[str, str]] = []
+        self._partial = Text()
+        self._indicator: Optional[tuple[str, float]] = None
+        self._depth = 0
+        self._live: Optional[Live] = None
+        self._ticker: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def write(self, chunk: str, style: str = "green") -> None:
+        """Queue ``chunk`` for the next frame; prints directly when no display is active."""
+        with self._lock:
+            if self._depth:
+                self._pending.append((chunk, style))
+                return
+        self._console.print(Text(chunk, style=style), end="")
+
+    @contextmanager
+    def live(self) -> Iterator["RenderEngine"]:
+        self._enter()
+        try:
+            yield self
+        finally:
+            self._exit()
+
+    def start_indicator(self, label: str) -> None:
+        """Show ``label`` with a spinner and elapsed timer below the streamed text."""
+        with self._lock:
+            replacing = self._indicator is not None
+            self._indicator = (label, time.monotonic())
+        if not replacing:
+            self._enter()
+
+    def stop_indicator(self, final: Optional[str] = None) -> None:
+        with self._lock:
+            if self._indicator is None:
+                return
+            self._indicator = None
+            if final is not None:
+                self._pending.append((final + "\n", "bold green"))
+        self._exit()
+
+    def _enter(self) -> None:
+        with self._lock:
+            self._depth += 1
+            if self._depth > 1:
+                return
+            self._partial = Text()
+            self._live = Live(
+                console=self._console,
+                auto_refresh=False,
+                redirect_stdout=True,
+                redirect_stderr=True,
+            )
+            self._live.start()
+            self._stop.clear()
+            self._ticker = threading.Thread(target=self._run, name="ui-render", daemon=True)
+            self._ticker.start()
+
+    def _exit(self) -> None:
+        with self._lock:
+            self._depth -= 1
+            if self._depth:
+                return
+            ticker, live = self._ticker, self._live
+            self._ticker = self._live = None
+        self._stop.set()
+        ticker.join()
+        # Final frame: commit everything, including an unterminated last line
+        self._frame(live, final=True)
+        live.stop()
+
+    def _run(self) -> None:
+        live = self._live
+        while not self._stop.wait(self._interval):
+            self._frame(live)
+
+    def _frame(self, live: Live, final: bool = False) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+            indicator = self._indicator
+        if not pending and indicator is None and not final:
+            return
+        for chunk, style in pending:
+            self._partial.append(chunk, style=style)
+        if final:
+            done, self._partial = self._partial, Text()
+            if done.plain:
+                live.console.print(done)
+        else:
+            cut = self._partial.plain.rfind("\n")
+            if cut >= 0:
+                done, self._partial = self._partial[:cut], self._partial[cut + 1:]
+                live.console.print(done)
+        parts = [self._partial] if self._partial.plain else []
+        if indicator is not None:
+            parts.append(_indicator_line(*indicator))
+        live.update(Group(*parts), refresh=True)
+
+
+def _indicator_line(label: str, started: float) -> Text:
+    elapsed = time.monotonic() - started
+    mins, secs = divmod(elapsed, 60)
+    ms = int((secs - int(secs)) * 100)
+    spin = SPINNER[int(elapsed * SPINNER_FPS) % len(SPINNER)]
+    return Text(f"{label} {spin}   {int(mins)}:{int(secs):02}.{ms:02}", style="bold green")
+
+
+renderer = RenderEngine(console)
+
+
+def stream_response(chunks) -> str:
+    """
+    Print agent text in green as it streams in; returns the full reply.
+    No artificial delay: the model's own pace is the typewriter effect.
+    """
     console.print("")  # spacing before response
-
-    # Render line by line, typewriter style
-    for line in text.splitlines():
-        for char in line:
-            console.print(char, style="green", end="")
-            sys.stdout.flush()
-            time.sleep(delay)
-        console.print("")  # newline after each line
-
-    console.print("")  # final spacing 
-
-# Spinner + timer for recording indicator
-def record_indicator(run_flag):
-    spinner = itertools.cycle(["|", "/", "-", "\\"])
-    start_time = time.time()
-    while run_flag[0]:
-        elapsed = time.time() - start_time
-        mins, secs = divmod(elapsed, 60)
-        ms = int((secs - int(secs)) * 100)
-        timer = f"{int(mins)}:{int(secs):02}.{ms:02}"
-        spin = next(spinner)
-        msg = f"🎙️  Recording... {spin}   {timer}"
-        console.print(Text(msg, style="bold green"), end="\r")
-        time.sleep(0.1)
-    # overwrite line when done
-    console.print(Text("Recorded Snippet", style="bold green"))
+    parts = []
+    with renderer.live():
+        for chunk in chunks:
+            parts.append(chunk)
+            renderer.write(chunk)
+    console.print("")  # final spacing
+    return "".join(parts)
+
+# Spinner + timer for recording indicator, driven by the renderer's ticker
+def start_record_indicator():
+    renderer.start_indicator("🎙️  Recording...")
+
+def stop_record_indicator():
+    renderer.stop_indicator("Recorded Snippet")
 
 def print_session_concluded():
     console.print("\n--- Session Concluded ---", style="red")
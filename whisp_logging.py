@@ -0,0 +1,111 @@
+"""
+Shared, non-blocking logging for Whisp.
+
+Loggers under ``whisp.*`` hand records to a ``QueueHandler``; a single
+``QueueListener`` thread formats them and writes the size-rotated log file.
+Audio callbacks and HTTP handler threads therefore never wait on disk.
+
+Extra fields passed with ``extra={...}`` are appended as ``key=value``:
+
+    log = whisp_logging.get_logger("recorder")
+    log.warning("capture stalled", extra={"queue_depth": 12})
+    # [2025-10-03 14:05:11] WARNING whisp.recorder (MainThread) capture stalled queue_depth=12
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+LOG_PATH = "debug_log.txt"
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+ROOT_LOGGER = "whisp"
+
+_STANDARD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+_listener: Optional[QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+class StructuredFormatter(logging.Formatter):
+    """Plain-text lines with any ``extra`` fields appended as ``key=value``."""
+
+    def __init__(self) -> None:
+        super().__init__("[%(asctime)s] %(levelname)s %(name)s (%(threadName)s) %(message)s", "%Y-%m-%d %H:%M:%S")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = [f"{key}={value!r}" if isinstance(value, str) and " " in value else f"{key}={value}"
+                  for key, value in vars(record).items() if key not in _STANDARD_ATTRS]
+        return f"{line} {' '.join(fields)}" if fields else line
+
+
+def configure(
+    path: str = LOG_PATH,
+    level: int = logging.INFO,
+    max_bytes: int = LOG_MAX_BYTES,
+    backups: int = LOG_BACKUPS,
+) -> None:
+    """Install the queue handler and start the writer thread; later calls are no-ops."""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+        file_handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True)
+        file_handler.setFormatter(StructuredFormatter())
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(level)
+        root.addHandler(QueueHandler(log_queue))
+        root.propagate = False
+        _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown)
+
+
+def shutdown() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    with _configure_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    configure()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+class RateLimitedLogger:
+    """
+    Log repeated messages at most once per ``interval`` seconds per key.
+
+    Meant for hot paths such as the PortAudio callback: suppressed
+    occurrences are only counted, and the count is reported with the next
+    message that gets through. No locks are taken, so the count may be off
+    by one under contention, which is fine for diagnostics.
+    """
+
+    def __init__(self, logger: logging.Logger, interval: float = 5.0) -> None:
+        self._logger = logger
+        self._interval = interval
+        self._last: dict[str, float] = {}
+        self._suppressed: dict[str, int] = {}
+
+    def log(self, level: int, key: str, message: str, **fields) -> None:
+        now = time.monotonic()
+        if now - self._last.get(key, -self._interval) < self._interval:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return
+        self._last[key] = now
+        suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            fields["suppressed"] = suppressed
+        self._logger.log(level, message, extra=fields)
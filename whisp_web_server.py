@@ -1,11 +1,19 @@
+import argparse
+import itertools
 import json
+import mimetypes
+import os
 import queue
+import select
+import socket
 import threading
+import uuid
 import time
 from datetime import datetime
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Hashable, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
 
 import recorder_latest  # reuses push-to-talk logic
 
@@ -14,12 +22,65 @@ try:
 except Exception:  # fallback when transcription module or credentials are unavailable
     transcripter_latest = None  # type: ignore
 
+try:
+    import my_agents as whisp_agents
+except Exception:  # agent SDK or credentials unavailable; /api/agent answers 503
+    whisp_agents = None  # type: ignore
+
 # Lazy import to avoid loading keyboard globally until we patch it per recording
 import keyboard  # type: ignore
 from unittest.mock import patch
 
+import http_io
+import metrics
+import session_export
+import tracing
+import whisp_logging
+from response_cache import ResponseCache
+from static_assets import StaticAssets, compress, negotiate_encoding
+from transcript_store import SQLiteTranscriptStore, history_json
+from transcription_queue import JobShedError, QueueFullError, TranscriptionQueue
+
+BASE_DIR = Path(__file__).resolve().parent
+UI_INDEX = "draft-whisppt-html-v05.html"
 SESSIONS_DIR = Path("sessions")
 SESSIONS_DIR.mkdir(exist_ok=True)
+UPLOADS_DIR = SESSIONS_DIR / "uploads"
+UPLOAD_MAX_BYTES = 200 * 1024 * 1024
+AUDIO_PREFIX = "/api/audio/"
+SESSIONS_PREFIX = "/api/sessions/"
+AGENT_PREFIX = "/api/agent/"
+FANOUT_PATH = "/api/agents"
+AGENT_BODY_MAX_BYTES = 64 * 1024
+TRANSCRIPT_DB_PATH = SESSIONS_DIR / "transcripts.db"
+SERVER_SESSION = datetime.now().strftime("%Y-%m-%d-%Hh-%Mm-session")
+HISTORY_PAGE_LIMIT = 200
+COMPRESS_MIN_BYTES = 1024
+CORS_MAX_AGE = 86400
+TRANSCRIPTION_WORKERS = 2
+TRANSCRIPTION_QUEUE_DEPTH = 8
+# How long a stop request waits for its transcript unless the client sends X-Client-Timeout
+STOP_TIMEOUT_SECONDS = 120.0
+
+HTTP_ROUTES = frozenset(
+    (
+        "/",
+        "/index.html",
+        "/metrics",
+        "/api/status",
+        "/api/history",
+        "/api/record/start",
+        "/api/record/stop",
+        "/api/transcribe",
+        "/api/agents",
+    )
+)
+HTTP_REQUESTS = metrics.counter("whisp_http_requests_total", "HTTP requests handled.", ("route", "method", "code"))
+HTTP_SECONDS = metrics.histogram("whisp_http_request_seconds", "HTTP handling latency.", ("route", "method"))
+RECORDER_SECONDS = metrics.histogram("whisp_recorder_seconds", "Recorder start/stop latency.", ("phase",))
+UPLOAD_RECEIVED_BYTES = metrics.counter("whisp_upload_received_bytes_total", "Audio bytes received via /api/transcribe.")
+
+log = whisp_logging.get_logger("web")
 
 
 class RecorderBusyError(RuntimeError):
@@ -71,8 +132,14 @@ class RecorderService:
         self._virtual_keys = VirtualKeypad()
         self._last_result: Optional[dict] = None
         self._last_error: Optional[str] = None
+        self._trace: Optional[tracing.Trace] = None
 
     def start(self) -> None:
+        trace = tracing.Trace("snippet")
+        with trace.span("recorder.start"):
+            self._start(trace)
+
+    def _start(self, trace: tracing.Trace) -> None:
         with self._lock:
             if self._thread and self._thread.is_alive():
                 raise RecorderBusyError("Recorder already running")
@@ -81,13 +148,15 @@ class RecorderService:
             self._last_result = None
             self._last_error = None
             self._virtual_keys.reset()
+            self._trace = trace
 
             def worker() -> None:
                 try:
-                    with patch.object(keyboard, "is_pressed", self._virtual_keys.is_pressed):
+                    with tracing.use(trace), patch.object(keyboard, "is_pressed", self._virtual_keys.is_pressed):
                         path = recorder_latest.record_push_to_talk()
-                    self._result_queue.put({"audio_path": path})
+                    self._result_queue.put({"audio_path": path, "trace": trace})
                 except Exception as exc:  # pragma: no cover - defensive logging
+                    log.exception("Recorder worker failed")
                     self._result_queue.put({"error": str(exc)})
 
             self._thread = threading.Thread(target=worker, daemon=True)
@@ -120,6 +189,7 @@ class RecorderService:
     def stop(self) -> dict:
         with self._lock:
             thread = self._thread
+            trace = self._trace
             cached_result = self._last_result
             cached_error = self._last_error
 
@@ -135,10 +205,11 @@ class RecorderService:
             raise RecorderIdleError("Recorder is not running")
 
         if thread.is_alive():
-            with self._lock:
-                self._virtual_keys.set_space(False)
-                self._virtual_keys.tap_backspace()
-            thread.join(timeout=10)
+            with trace.span("recorder.stop"):
+                with self._lock:
+                    self._virtual_keys.set_space(False)
+                    self._virtual_keys.tap_backspace()
+                thread.join(timeout=10)
             if thread.is_alive():
                 raise RuntimeError("Recorder did not shut down cleanly")
         else:
@@ -189,82 +260,351 @@ def run_transcription(audio_path: str) -> tuple[str, bool]:
             transcript = f"[Empty transcript @ {timestamp}]"
         return transcript, False
     except Exception as exc:
+        metrics.ERRORS.labels("transcription_fallback").inc()
         fallback = f"[Mock transcript @ {timestamp}: {exc}]"
         return fallback, True
 
 
-class TranscriptStore:
-    def __init__(self) -> None:
-        self._lock = threading.Lock()
-        self._entries: list[dict] = []
-
-    def add(self, transcript: str, audio_path: str, mocked: bool) -> dict:
-        entry = {
-            "transcript": transcript,
-            "audio_path": audio_path,
-            "mocked": mocked,
-            "timestamp": datetime.utcnow().isoformat(),
-        }
-        with self._lock:
-            self._entries.append(entry)
-        return entry
-
-    def all(self) -> list[dict]:
-        with self._lock:
-            return list(self._entries)
-
-
 recorder_service = RecorderService()
-transcript_store = TranscriptStore()
+transcript_store = SQLiteTranscriptStore(TRANSCRIPT_DB_PATH)
+response_cache = ResponseCache()
+static_assets = StaticAssets(BASE_DIR, UI_INDEX)
+# Resolve run_transcription at call time so it can be swapped (e.g. by bench.http_load)
+transcription_queue = TranscriptionQueue(
+    lambda audio_path: run_transcription(audio_path), TRANSCRIPTION_WORKERS, TRANSCRIPTION_QUEUE_DEPTH
+)
+
+
+def resolve_session_audio(audio_path: str) -> Optional[Path]:
+    """Resolve ``audio_path`` (symlinks included), refusing anything outside SESSIONS_DIR."""
+    root = SESSIONS_DIR.resolve()
+    resolved = Path(audio_path).resolve()
+    return resolved if resolved.is_relative_to(root) and resolved.is_file() else None
+
+
+def route_label(path: str) -> str:
+    """Collapse request paths into a bounded set of metric labels."""
+    if path in HTTP_ROUTES:
+        return path
+    if path.startswith("/assets/"):
+        return "/assets"
+    if path.startswith(AUDIO_PREFIX):
+        return "/api/audio"
+    if path.startswith(SESSIONS_PREFIX):
+        return "/api/sessions/export"
+    if path.startswith(AGENT_PREFIX):
+        return "/api/agent"
+    return "other"
+
+
+def build_status_body() -> tuple[Hashable, bytes]:
+    """
+    Serialize /api/status from cached entry fragments.
+
+    The body is rebuilt only when the newest entry, recorder status or last
+    error changes; otherwise every poll reuses the same bytes.
+    """
+    history = transcript_store.all()
+    status = recorder_service.status()
+    last_error = recorder_service.last_error()
+    version = (history[-1].id if history else 0, status, last_error)
+
+    def build() -> bytes:
+        return b"".join(
+            (
+                b'{"status": ',
+                json.dumps(status).encode("utf-8"),
+                b', "history": ',
+                history_json(history),
+                b', "last_error": ',
+                json.dumps(last_error).encode("utf-8"),
+                b"}",
+            )
+        )
+
+    return version, response_cache.get("status", version, build)
 
 
 class RequestHandler(BaseHTTPRequestHandler):
     protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY keep-alive
+    # clients stall ~40ms per response on Nagle + delayed ACK
+    disable_nagle_algorithm = True
 
     def log_message(self, format: str, *args) -> None:  # pragma: no cover - silence default logs
         return
 
-    def _set_headers(self, status: int = 200) -> None:
+    def send_response(self, code: int, message: Optional[str] = None) -> None:
+        self._response_code = code
+        super().send_response(code, message)
+
+    def _instrumented(self, dispatch: Callable[[], None]) -> None:
+        self._response_code = 0
+        started = time.perf_counter()
+        try:
+            dispatch()
+        finally:
+            route = route_label(urlsplit(self.path).path)
+            HTTP_SECONDS.labels(route, self.command).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(route, self.command, str(self._response_code)).inc()
+            if self._response_code >= 500:
+                metrics.ERRORS.labels("http").inc()
+
+    def _set_headers(self, status: int = 200, content_type: str = "application/json") -> None:
         self.send_response(status)
-        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Type", content_type)
         self.send_header("Access-Control-Allow-Origin", "*")
         self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-
-    def _write_json(self, payload: dict, status: int = 200) -> None:
-        body = json.dumps(payload).encode("utf-8")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type, X-Client-Timeout")
+
+    def _write_json(self, payload: dict, status: int = 200, headers: Optional[dict] = None) -> None:
+        self._write_body(json.dumps(payload).encode("utf-8"), status, headers=headers)
+
+    def _write_body(
+        self,
+        body: bytes,
+        status: int = 200,
+        encoded: Optional[Callable[[str], bytes]] = None,
+        headers: Optional[dict] = None,
+    ) -> None:
+        """Write a JSON body, compressing it when large and the client allows.
+
+        ``encoded`` may supply an already-compressed (e.g. cached) variant.
+        """
+        encoding = None
+        if len(body) >= COMPRESS_MIN_BYTES:
+            encoding = negotiate_encoding(self.headers.get("Accept-Encoding"))
+            if encoding:
+                body = encoded(encoding) if encoded else compress(body, encoding)
         self._set_headers(status)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
         self.send_header("Content-Length", str(len(body)))
         self.end_headers()
         self.wfile.write(body)
 
+    def _write_static(self, path: str, head_only: bool = False) -> bool:
+        asset = static_assets.get(path)
+        if asset is None:
+            return False
+        not_modified = asset.not_modified(
+            self.headers.get("If-None-Match"), self.headers.get("If-Modified-Since")
+        )
+        body = asset.body
+        use_gzip = asset.gzip_body is not None and negotiate_encoding(self.headers.get("Accept-Encoding")) == "gzip"
+        if use_gzip:
+            body = asset.gzip_body
+
+        self.send_response(304 if not_modified else 200)
+        self.send_header("Content-Type", asset.content_type)
+        self.send_header("Cache-Control", asset.cache_control)
+        self.send_header("ETag", asset.etag)
+        self.send_header("Last-Modified", asset.last_modified)
+        if asset.gzip_body is not None:
+            self.send_header("Vary", "Accept-Encoding")
+        if not_modified:
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return True
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+        return True
+
     def do_OPTIONS(self) -> None:  # noqa: N802
+        self._instrumented(self._route_options)
+
+    def do_HEAD(self) -> None:  # noqa: N802
+        self._instrumented(self._route_head)
+
+    def do_GET(self) -> None:  # noqa: N802
+        self._instrumented(self._route_get)
+
+    def do_POST(self) -> None:  # noqa: N802
+        self._instrumented(self._route_post)
+
+    def _route_options(self) -> None:
         self._set_headers(204)
+        self.send_header("Access-Control-Max-Age", str(CORS_MAX_AGE))
         self.send_header("Content-Length", "0")
         self.end_headers()
 
-    def do_GET(self) -> None:  # noqa: N802
-        if self.path == "/api/status":
-            payload = {
-                "status": recorder_service.status(),
-                "history": transcript_store.all(),
-                "last_error": recorder_service.last_error(),
-            }
-            self._write_json(payload)
+    def _route_head(self) -> None:
+        path = urlsplit(self.path).path
+        if path.startswith(AUDIO_PREFIX):
+            self._handle_audio(path[len(AUDIO_PREFIX):], head_only=True)
+        elif not self._write_static(path, head_only=True):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    def _route_get(self) -> None:
+        url = urlsplit(self.path)
+        if url.path == "/api/status":
+            version, body = build_status_body()
+            self._write_body(
+                body,
+                encoded=lambda encoding: response_cache.get(
+                    f"status:{encoding}", version, lambda: compress(body, encoding)
+                ),
+            )
+        elif url.path == "/api/history":
+            self._handle_history(parse_qs(url.query))
+        elif url.path == "/metrics":
+            self._handle_metrics()
+        elif url.path.startswith(AUDIO_PREFIX):
+            self._handle_audio(url.path[len(AUDIO_PREFIX):])
+        elif url.path.startswith(SESSIONS_PREFIX):
+            self._handle_export(url.path[len(SESSIONS_PREFIX):])
+        elif self._write_static(url.path):
+            return
         else:
             self._write_json({"error": "Not found"}, status=404)
 
-    def do_POST(self) -> None:  # noqa: N802
+    def _handle_history(self, query: dict) -> None:
+        try:
+            before_id, limit = http_io.parse_page_query(query, 50, HISTORY_PAGE_LIMIT)
+        except ValueError:
+            self._write_json({"error": "before and limit must be integers, limit at least 1"}, status=400)
+            return
+        self._write_body(b'{"history": ' + history_json(transcript_store.page(before_id, limit)) + b"}")
+
+    def _handle_audio(self, entry_id: str, head_only: bool = False) -> None:
+        """Serve an entry's recording with Range support, copying file -> socket in the kernel."""
+        entry = transcript_store.get(int(entry_id)) if entry_id.isdigit() else None
+        if entry is None:
+            self._write_json({"error": "Not found"}, status=404)
+            return
+        path = resolve_session_audio(entry.audio_path)
+        if path is None:
+            self._write_json({"error": "Audio is outside the sessions directory"}, status=403)
+            return
+        try:
+            f = open(path, "rb")
+        except OSError:
+            self._write_json({"error": "Audio file missing"}, status=404)
+            return
+
+        with f:
+            stat = os.fstat(f.fileno())
+            size = stat.st_size
+            etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            byte_range = None
+            if_range = self.headers.get("If-Range")
+            if if_range is None or if_range == etag:
+                try:
+                    byte_range = http_io.parse_byte_range(self.headers.get("Range"), size)
+                except http_io.RangeNotSatisfiable:
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{size}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+            start, end = byte_range if byte_range else (0, size - 1)
+            length = end - start + 1 if size else 0
+            self._set_headers(206 if byte_range else 200, mimetypes.guess_type(path.name)[0] or "application/octet-stream")
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "private, max-age=3600")
+            if byte_range:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            self.send_header("Content-Length", str(length))
+            self.end_headers()
+            if not head_only and length:
+                # wfile is unbuffered, so headers are already on the wire
+                self.connection.sendfile(f, offset=start, count=length)
+
+    def _handle_export(self, tail: str) -> None:
+        """
+        Stream ``<session>/export.txt`` or ``<session>/export.wav`` with chunked encoding.
+
+        ``session`` is a transcript-store session (this server's, or backfill)
+        or a CLI session with a record log under ``sessions/``. Snippets are
+        paged or read sequentially and audio is copied in fixed-size pieces,
+        so memory use is independent of the session's length.
+        """
+        session, _, export_name = tail.rpartition("/")
+        session = unquote(session)
+        if not session or export_name not in ("export.txt", "export.wav"):
+            self._write_json({"error": "Not found"}, status=404)
+            return
+        source = session_export.session_source(transcript_store, session, SESSIONS_DIR)
+        if source is None:
+            self._write_json({"error": f"Unknown session {session!r}"}, status=404)
+            return
+
+        if export_name == "export.txt":
+            pieces = session_export.iter_transcript(source())
+            content_type = "text/plain; charset=utf-8"
+        else:
+            resolve = resolve_session_audio
+            plan = session_export.plan_wav(source, resolve)
+            try:
+                pieces = session_export.iter_concat_wav(source, plan, resolve)
+                header = next(pieces)
+            except session_export.ExportError as exc:
+                self._write_json({"error": str(exc)}, status=404)
+                return
+            pieces = itertools.chain((header,), pieces)
+            content_type = "audio/wav"
+
+        chunked = self.request_version != "HTTP/1.0"
+        filename = "".join(c if c.isalnum() or c in "-_." else "_" for c in session)
+        self._set_headers(200, content_type)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Content-Disposition", f'attachment; filename="{filename}.{export_name[-3:]}"')
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        else:
+            self.close_connection = True
+        self.end_headers()
+        try:
+            http_io.write_chunked(self.wfile, pieces, chunked)
+        except OSError:
+            # Client went away mid-download; the body cannot be completed
+            self.close_connection = True
+
+    def _handle_metrics(self) -> None:
+        body = metrics.REGISTRY.render()
+        self._set_headers(200, metrics.CONTENT_TYPE)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route_post(self) -> None:
         if self.path == "/api/record/start":
             self._handle_start()
         elif self.path == "/api/record/stop":
             self._handle_stop()
+        elif self.path == "/api/transcribe":
+            self._handle_upload()
+        elif self.path.startswith(AGENT_PREFIX):
+            self._handle_agent(self.path[len(AGENT_PREFIX):])
+        elif self.path == FANOUT_PATH:
+            self._handle_fan_out()
         else:
             self._write_json({"error": "Not found"}, status=404)
 
     def _handle_start(self) -> None:
         try:
-            recorder_service.start()
+            with RECORDER_SECONDS.labels("start").time():
+                recorder_service.start()
         except RecorderBusyError as exc:
             self._write_json({"error": str(exc)}, status=409)
             return
@@ -275,7 +615,8 @@ class RequestHandler(BaseHTTPRequestHandler):
 
     def _handle_stop(self) -> None:
         try:
-            result = recorder_service.stop()
+            with RECORDER_SECONDS.labels("stop").time():
+                result = recorder_service.stop()
             audio_path = result["audio_path"]
         except RecorderIdleError as exc:
             self._write_json({"error": str(exc)}, status=409)
@@ -284,12 +625,225 @@ class RequestHandler(BaseHTTPRequestHandler):
             self._write_json({"error": str(exc)}, status=500)
             return
 
-        transcript_text, mocked = run_transcription(audio_path)
-        entry = transcript_store.add(transcript_text, audio_path, mocked)
-        self._write_json({"status": "completed", **entry})
+        self._transcribe_and_respond(audio_path, result.get("trace") or tracing.Trace("snippet"))
+
+    def _handle_upload(self) -> None:
+        """Stream a WAV/FLAC/Ogg request body to disk, then transcribe it like a recording."""
+        trace = tracing.Trace("upload")
+        UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
+        stem = f"{datetime.now():%Y-%m-%d-%Hh-%Mm}-upload-{uuid.uuid4().hex[:8]}"
+        partial_path = UPLOADS_DIR / f"{stem}.part"
+        head = b""
+        try:
+            with trace.span("upload.receive"), open(partial_path, "wb") as f:
+                for piece in http_io.iter_request_body(self.rfile, self.headers, UPLOAD_MAX_BYTES):
+                    if len(head) < http_io.SNIFF_BYTES:
+                        head += piece[: http_io.SNIFF_BYTES - len(head)]
+                        if len(head) == http_io.SNIFF_BYTES and not http_io.sniff_audio_format(head):
+                            raise http_io.BodyError("Body must be WAV, FLAC or Ogg audio", status=415)
+                    f.write(piece)
+                    UPLOAD_RECEIVED_BYTES.inc(len(piece))
+            audio_format = http_io.sniff_audio_format(head)
+            if audio_format is None:
+                raise http_io.BodyError("Body must be WAV, FLAC or Ogg audio", status=415)
+        except http_io.BodyError as exc:
+            partial_path.unlink(missing_ok=True)
+            # The rest of the body is unread, so the connection cannot be reused
+            self.close_connection = True
+            self._write_json({"error": str(exc)}, status=exc.status)
+            return
+        except OSError as exc:
+            partial_path.unlink(missing_ok=True)
+            self.close_connection = True
+            self._write_json({"error": str(exc)}, status=500)
+            return
+
+        audio_path = UPLOADS_DIR / f"{stem}.{audio_format}"
+        os.replace(partial_path, audio_path)
+        self._transcribe_and_respond(str(audio_path), trace)
+
+    def _read_json_body(self, max_bytes: int) -> dict:
+        body = b"".join(http_io.iter_request_body(self.rfile, self.headers, max_bytes))
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise http_io.BodyError("Body must be JSON") from None
+        if not isinstance(payload, dict):
+            raise http_io.BodyError("Body must be a JSON object")
+        return payload
+
+    def _handle_agent(self, key: str) -> None:
+        """
+        Stream an agent's reply as chunked plain text, token by token.
+
+        The body is ``{"text": ...}`` or ``{"entry_id": n}`` to reuse a stored
+        transcript. Time to first byte is the model's time to first token.
+        """
+        try:
+            payload = self._read_json_body(AGENT_BODY_MAX_BYTES)
+        except http_io.BodyError as exc:
+            self.close_connection = True
+            self._write_json({"error": str(exc)}, status=exc.status)
+            return
+        if whisp_agents is None:
+            self._write_json({"error": "Agents are unavailable"}, status=503)
+            return
+        if key not in whisp_agents.AGENTS:
+            self._write_json({"error": f"Unknown agent {key!r}"}, status=404)
+            return
+
+        text = self._agent_input(payload)
+        if text is None:
+            return
+
+        chunked = self.request_version != "HTTP/1.0"
+        self._set_headers(200, "text/plain; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("X-Accel-Buffering", "no")  # keep reverse proxies from batching tokens
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        else:
+            self.close_connection = True
+        self.end_headers()
+        deltas = whisp_agents.stream_agent(key, text)
+        try:
+            http_io.write_chunked(self.wfile, (delta.encode("utf-8") for delta in deltas), chunked)
+        except OSError:
+            self.close_connection = True
+        finally:
+            deltas.close()  # cancels the run if the client went away
+
+    def _agent_input(self, payload: dict) -> Optional[str]:
+        """The transcript named by ``text`` or ``entry_id``; answers the request and returns None if invalid."""
+        text = payload.get("text")
+        if text is None and "entry_id" in payload:
+            entry = transcript_store.get(payload["entry_id"]) if isinstance(payload["entry_id"], int) else None
+            if entry is None:
+                self._write_json({"error": "Unknown entry"}, status=404)
+                return None
+            text = entry.transcript
+        if not isinstance(text, str) or not text.strip():
+            self._write_json({"error": "text or entry_id required"}, status=400)
+            return None
+        return text
+
+    def _handle_fan_out(self) -> None:
+        """
+        Send one transcript to several agents at once and return every reply.
+
+        Body: ``{"text" | "entry_id", "agents": [...], "mode": "all" | "first",
+        "deadlines": {agent: seconds}, "timeout": seconds}``; agents default
+        to all of them. Total latency is roughly that of the slowest agent
+        (or the fastest, with mode "first").
+        """
+        try:
+            payload = self._read_json_body(AGENT_BODY_MAX_BYTES)
+        except http_io.BodyError as exc:
+            self.close_connection = True
+            self._write_json({"error": str(exc)}, status=exc.status)
+            return
+        if whisp_agents is None:
+            self._write_json({"error": "Agents are unavailable"}, status=503)
+            return
+        keys = payload.get("agents") or list(whisp_agents.AGENTS)
+        deadlines = payload.get("deadlines") or {}
+        timeout = payload.get("timeout")
+        mode = payload.get("mode", "all")
+        limits = list(deadlines.values()) + ([timeout] if timeout is not None else []) if isinstance(deadlines, dict) else None
+        if (
+            not isinstance(keys, list)
+            or not all(isinstance(key, str) for key in keys)
+            or limits is None
+            or not all(isinstance(limit, (int, float)) and limit > 0 for limit in limits)
+            or mode not in ("all", "first")
+        ):
+            self._write_json({"error": "Invalid agents, mode, deadlines or timeout"}, status=400)
+            return
+        unknown = [key for key in [*keys, *deadlines] if key not in whisp_agents.AGENTS]
+        if unknown:
+            self._write_json({"error": f"Unknown agent(s): {', '.join(map(str, unknown))}"}, status=404)
+            return
+        text = self._agent_input(payload)
+        if text is None:
+            return
 
+        started = time.perf_counter()
+        results = whisp_agents.fan_out(keys, text, first=mode == "first", deadlines=deadlines, timeout=timeout)
+        self._write_json({
+            "mode": mode,
+            "seconds": round(time.perf_counter() - started, 3),
+            "results": [dict(result.to_dict(), key=key) for key, result in zip(keys, results)],
+        })
 
-def run_server(host: str = "127.0.0.1", port: int = 8000) -> None:
+    def _transcribe_and_respond(self, audio_path: str, trace: tracing.Trace) -> None:
+        status = 500
+        try:
+            try:
+                job = transcription_queue.submit(
+                    audio_path, trace, timeout=self._client_timeout(), abandoned=self._client_gone
+                )
+            except QueueFullError as exc:
+                # Nothing is lost: a retried stop resubmits the recording cached in
+                # recorder_service, and an upload stays on disk at audio_path
+                status = 429
+                self._write_json(
+                    {"error": str(exc), "audio_path": audio_path, "retry_after": exc.retry_after},
+                    status=status,
+                    headers={"Retry-After": str(exc.retry_after)},
+                )
+                return
+
+            try:
+                transcript_text, mocked = transcription_queue.wait(job)
+            except TimeoutError:
+                status = 504
+                self._write_json({"error": "Transcription timed out", "audio_path": audio_path}, status=status)
+                return
+            except JobShedError as exc:
+                status = 503
+                self._write_json({"error": str(exc), "audio_path": audio_path}, status=status)
+                return
+
+            with tracing.use(trace), tracing.span("store.add"):
+                entry = transcript_store.add(transcript_text, audio_path, mocked, session=SERVER_SESSION)
+            timing = trace.breakdown()
+            status = 200
+            # Splice the cached entry fragment instead of re-encoding it
+            self._write_body(
+                b'{"status": "completed", "timing": ' + json.dumps(timing).encode("utf-8") + b", " + entry.to_json()[1:]
+            )
+        finally:
+            # Shed, timed-out and failed snippets are the ones worth tracing
+            now = time.perf_counter()
+            trace.record("http.response", now, now, status=status)
+            trace.finish()
+
+    def _client_timeout(self) -> float:
+        try:
+            return min(float(self.headers.get("X-Client-Timeout", STOP_TIMEOUT_SECONDS)), STOP_TIMEOUT_SECONDS)
+        except ValueError:
+            return STOP_TIMEOUT_SECONDS
+
+    def _client_gone(self) -> bool:
+        """True when the peer has closed its end while we were queued."""
+        try:
+            readable, _, _ = select.select([self.connection], [], [], 0)
+            if not readable:
+                return False
+            return self.connection.recv(1, socket.MSG_PEEK) == b""
+        except (OSError, ValueError):
+            return True
+
+
+def run_server(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    queue_depth: int = TRANSCRIPTION_QUEUE_DEPTH,
+    workers: int = TRANSCRIPTION_WORKERS,
+) -> None:
+    global transcription_queue
+    transcription_queue = TranscriptionQueue(lambda audio_path: run_transcription(audio_path), workers, queue_depth)
+    static_assets.load()
     server = ThreadingHTTPServer((host, port), RequestHandler)
     print(f"Server running on http://{host}:{port}")
     try:
@@ -298,7 +852,16 @@ def run_server(host: str = "127.0.0.1", port: int = 8000) -> None:
         print("\nStopping server...")
     finally:
         server.server_close()
+        transcript_store.close()
 
 
 if __name__ == "__main__":
-    run_server()
+    parser = argparse.ArgumentParser(description="Whisp push-to-talk HTTP bridge")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--queue-depth", type=int, default=TRANSCRIPTION_QUEUE_DEPTH,
+                        help="transcription jobs allowed to wait before stop returns 429")
+    parser.add_argument("--workers", type=int, default=TRANSCRIPTION_WORKERS,
+                        help="concurrent transcription workers")
+    args = parser.parse_args()
+    run_server(args.host, args.port, args.queue_depth, args.workers)